@@ -1,29 +1,34 @@
+import functools
 import os
 import re
-from typing import Any, Dict, List, Tuple
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional, Tuple
+
+
+# Tabla de plegado precalculada: cubre los acentuados del español (ambas cajas)
+# sin pasar por unicodedata.normalize en cada llamada.
+_FOLD = str.maketrans({
+    "á": "a", "é": "e", "í": "i", "ó": "o", "ú": "u", "ü": "u", "ñ": "n",
+    "Á": "a", "É": "e", "Í": "i", "Ó": "o", "Ú": "u", "Ü": "u", "Ñ": "n",
+})
 
 
 def _norm(s: str) -> str:
     """Normaliza texto para matching (minúsculas, sin acentos)."""
-    import unicodedata
-
-    s = (s or "").strip()
-    s = "".join(
-        c for c in unicodedata.normalize("NFKD", s) if not unicodedata.combining(c)
-    )
-    return s.casefold()
+    return (s or "").strip().translate(_FOLD).casefold()
 
 
 def _score_keywords(qn: str, keywords: List[str]) -> int:
-    """Puntúa cuántas palabras clave aparecen en el texto normalizado."""
-    score = 0
-    for kw in keywords:
-        kwn = _norm(kw)
-        if not kwn:
-            continue
-        if kwn in qn:
-            score += 1
-    return score
+    """Puntúa cuántas palabras clave (ya normalizadas) aparecen en el texto.
+
+    Nota de performance: se evaluó compilar este loop con Numba/Cython, pero
+    el operador `in` de str ya ejecuta la búsqueda de substrings en C (two-way
+    search) y el costo Python restante es marginal para ~60 keywords. Agregar
+    una toolchain de compilación no se justifica en este deploy.
+    """
+    return sum(1 for kw in keywords if kw in qn)
 
 
 # Lista MUY acotada de insultos graves (evitamos falsos positivos).
@@ -37,6 +42,62 @@ _OFFENSIVE_WORDS = [
     "mierda",
 ]
 
+# Patrones compilados una sola vez al importar el módulo (evita recompilar
+# por palabra y por llamada en los caminos calientes). Sin IGNORECASE: el
+# texto ya llega en minúsculas, así el motor no hace case-folding por posición.
+_OFFENSIVE_RE = re.compile(
+    r"\b(" + "|".join(re.escape(w.lower()) for w in _OFFENSIVE_WORDS) + r")\b"
+)
+
+# Prefiltro barato: si ningún token del texto está en el set, ni siquiera
+# corremos la regex (el caso limpio es por lejos el más común).
+_OFFENSIVE_SET = frozenset(_OFFENSIVE_WORDS)
+_WORD_RE = re.compile(r"\w+")
+
+# hyperscan (opcional): matching DFA con SIMD para cuando la lista de
+# moderación crezca. Si no está instalado, seguimos con re sin cambios.
+try:
+    import hyperscan  # type: ignore
+except Exception:  # pragma: no cover
+    hyperscan = None
+
+_OFFENSIVE_DB = None
+if hyperscan is not None:
+    try:
+        _OFFENSIVE_DB = hyperscan.Database()
+        _OFFENSIVE_DB.compile(
+            expressions=[
+                rb"\b" + re.escape(w.lower()).encode("utf-8") + rb"\b"
+                for w in _OFFENSIVE_WORDS
+            ],
+            ids=list(range(len(_OFFENSIVE_WORDS))),
+        )
+    except Exception:  # pragma: no cover
+        _OFFENSIVE_DB = None
+
+
+def _offensive_hits(text: str) -> set:
+    """Palabras ofensivas presentes en `text` (ya en minúsculas)."""
+    if _OFFENSIVE_DB is not None:
+        hits: set = set()
+
+        def _on_match(idx, start, end, flags, ctx=None):
+            hits.add(_OFFENSIVE_WORDS[idx])
+
+        try:
+            _OFFENSIVE_DB.scan(text.encode("utf-8"), match_event_handler=_on_match)
+            return hits
+        except Exception:  # pragma: no cover
+            pass
+    return set(_OFFENSIVE_RE.findall(text))
+
+# Saludos: todas las variantes son literales, así que alcanza con normalizar
+# y mirar en un frozenset (sin motor de regex).
+_GREETINGS = frozenset({
+    "hola", "buenas", "buen dia", "buenas tardes", "buenas noches",
+    "hey", "hello", "que tal", "como va",
+})
+
 
 def review_requirement(title: str, description: str) -> Dict[str, Any]:
     """Revisión liviana del texto antes de publicar.
@@ -52,19 +113,21 @@ def review_requirement(title: str, description: str) -> Dict[str, Any]:
 
     t = (title or "").strip()
     d = (description or "").strip()
-    text = f"{t}\n{d}".lower()
 
-    hits = []
-    for w in _OFFENSIVE_WORDS:
-        if re.search(rf"\b{re.escape(w)}\b", text, re.IGNORECASE):
-            hits.append(w)
+    # Escaneamos título y descripción por separado: evita concatenar (y
+    # copiar en minúsculas) descripciones largas, y el prefiltro descarta
+    # cada segmento limpio sin pasar por el matcher.
+    hits_set: set = set()
+    for src in (t, d):
+        low = src.lower()
+        if low and set(_WORD_RE.findall(low)) & _OFFENSIVE_SET:
+            hits_set |= _offensive_hits(low)
 
-    if hits:
-        hits = sorted(set(hits))
+    if hits_set:
         return {
             "ok": False,
             "reason": "El texto contiene palabras ofensivas. Por favor, revisalo y volvé a intentar.",
-            "hits": hits,
+            "hits": sorted(hits_set),
         }
 
     # Por ahora no reescribimos contenido (solo validación).
@@ -76,19 +139,458 @@ def review_requirement(title: str, description: str) -> Dict[str, Any]:
     }
 
 
+# Prompt de sistema estable (prefijo idéntico entre llamadas: habilita el
+# prompt caching del lado del proveedor y evita reconstruir el string).
+_SYSTEM_PROMPT = """Sos un asistente dentro del sistema ‘CPF – Sistema de Requerimientos (sin precios)’. Ayudás a usuarios a entender y usar el sistema.
+
+Reglas:
+- Respondé SIEMPRE en español.
+- Sé flexible y conversacional (estilo ChatGPT).
+- Si el usuario no entiende, explicá de otra manera con ejemplos.
+- Si falta info, hacé 1–2 preguntas concretas.
+- No inventes datos ni funciones que no existen.
+- Respuestas prácticas, con pasos.
+
+Contexto del sistema (resumen):
+- Objetivo: publicar OFERTAS/NECESIDADES y gestionar el interés/contacto **sin precios** dentro del sistema.
+- Tabs principales (usuarios empresa): Navegar, Publicar, Bandeja, Panel, Interesados, Asistente IA.
+- Registro: **Cámara/Institución** y **Teléfono** son obligatorios. Los usuarios nuevos quedan **Pendientes** hasta validación.
+- Validación: la realiza el **Asistente** de la cámara (rol *assistant*) o el **Super Admin**. Los asistentes se habilitan por **Super Admin**.
+- Asistentes: ven un **panel único** de validación, acotado a su cámara; no publican ni ven otras cámaras.
+- Publicar: normalmente se pide **Categoría** y **Ubicación**. Adjuntos: **máximo 2**; el **adjunto 1 debe ser imagen** y se usa como **portada**.
+- Bandeja: solicitudes de contacto recibidas (pendientes) + edición/cierre de tus publicaciones.
+- Interesados: historial de solicitudes (Recibidas y Enviadas) con contacto de ambos lados cuando se acepta.
+- Recuperar contraseña: botón **‘Olvidé mi contraseña’** → llega una **clave provisoria por email** (vence en minutos) → definís nueva contraseña.
+- Roles: user (empresa), admin (operativo), assistant (validador por cámara), Super Admin (moderación/anulación, cámaras, backups, alta de Super Admin, validación de usuarios).
+- Admin: puede ver un **indicador de almacenamiento** (uso de disco) en la barra lateral ‘Sesión’ (si está habilitado).
+- Seguridad: se aceptan solo tipos de adjuntos permitidos; se bloquean ejecutables.
+"""
+
+
+@functools.lru_cache(maxsize=1)
+def _get_openai_client():
+    """Cliente OpenAI único por proceso (evita rehacer pools httpx por llamada)."""
+    from openai import OpenAI  # type: ignore
+
+    return OpenAI()
+
+
+# Import tolerante de services (si falla, el asistente sigue sin métricas).
+try:
+    import services as _svc
+except Exception:  # pragma: no cover
+    _svc = None
+
+
+# Cache con TTL corto para las métricas: una ráfaga de consultas comparte
+# un solo fetch en vez de golpear la DB por cada turno del asistente.
+_STATS_TTL_SECONDS = 5.0
+_stats_cache: dict = {}
+_stats_ts: float = float("-inf")
+
+
 def _safe_get_stats() -> dict:
-    """Importa services en forma diferida para evitar dependencias circulares.
-    Si falla, devuelve {} (no rompe el asistente).
+    """Obtiene métricas vía services. Si falla, devuelve {} (no rompe el asistente)."""
+    global _stats_cache, _stats_ts
+    now = time.monotonic()
+    if now - _stats_ts < _STATS_TTL_SECONDS:
+        return _stats_cache
+    stats: dict = {}
+    if _svc is not None:
+        try:
+            out = _svc.get_stats()
+            if isinstance(out, dict):
+                stats = out
+        except Exception:
+            stats = {}
+    _stats_cache = stats
+    _stats_ts = now
+    return stats
+
+
+# KB: respuestas guiadas por intención (keywords normalizadas una sola vez al
+# importar; la estructura es inmutable, nada se reconstruye por consulta)
+# Respuestas del KB como constantes de módulo: el dict devuelto referencia
+# siempre el mismo objeto string (cero copias, menos presión de GC).
+_ANS_PUBLICAR = (
+    "Para **publicar** una Oferta o Necesidad:\n"
+    "1) Entrá a **Publicar**.\n"
+    "2) Elegí el **Tipo** (Oferta / Necesidad).\n"
+    "3) Completá **Título** y **Descripción** (claros y concretos).\n"
+    "4) Elegí **Categoría** y completá **Ubicación** (obligatorias).\n"
+    "5) Opcional: **Urgencia** y **Tags**.\n"
+    "6) **Adjuntos:** máximo 2. Si se solicita **portada**, el **adjunto 1 debe ser una imagen** (JPG/JPEG/PNG/GIF/WEBP) y se verá como portada; luego podés adjuntar PDF/Word/Excel.\n"
+    "7) Tocá **Publicar**.\n\n"
+    "Tip: los **tags** ayudan muchísimo para que te encuentren (ej: ‘mecanizado, calderería, logística, válvulas’).\n"
+    "Nota: el sistema es **sin precios**; la negociación se hace fuera del CPF."
+)
+
+_ANS_NAVEGAR = (
+    "Para **buscar/navegar** publicaciones:\n"
+    "1) En **Navegar**, elegí la **Cámara** (o ‘(Todas)’).\n"
+    "2) Usá **Buscar** para texto libre (empresa, producto, tags, etc.).\n"
+    "3) Ajustá **Tipo** (Oferta/Necesidad) y **Estado** (abierto/cerrado).\n\n"
+    "Si me decís qué querés encontrar, te sugiero filtros concretos."
+)
+
+_ANS_BANDEJA = (
+    "La **Bandeja** tiene 2 partes:\n"
+    "• **Solicitudes recibidas**: cuando alguien te pide contacto por una de tus publicaciones (podés **Aceptar** o **Rechazar**).\n"
+    "• **Mis publicaciones**: podés **editar** o **cerrar** (cambiar estado) tus ofertas/necesidades.\n\n"
+    "Si aceptás una solicitud, el contacto queda visible en **Interesados** (historial), para ambos lados."
+)
+
+_ANS_INTERESADOS = (
+    "**Interesados** es el lugar para ver el **historial** de solicitudes de contacto (no se pierden).\n\n"
+    "Dentro de Interesados tenés:\n"
+    "• **Recibidas**: solicitudes que te hicieron por tus publicaciones.\n"
+    "• **Enviadas**: solicitudes que vos hiciste a otros.\n\n"
+    "En cada solicitud vas a ver **los dos contactos** (el tuyo y el de la otra parte), para que cualquiera de los dos pueda comunicarse.\n"
+    "Estados: **Pendiente**, **Aceptada**, **Rechazada**."
+)
+
+_ANS_VALIDACION_USUARIOS = (
+    "📌 **Registro con validación**\n\n"
+    "Cuando te registrás, tu cuenta queda **Pendiente**.\n"
+    "Hasta que un **Super Admin** la habilite, no vas a poder ingresar (vas a ver el aviso de ‘pendiente de validación’).\n\n"
+    "¿Quién valida y dónde?\n"
+    "• Super Admin → pestaña **Panel** → **Validar usuarios**.\n\n"
+    "Si necesitás acceso urgente, avisale al administrador/superadmin para que te habilite."
+)
+
+_ANS_ADJUNTOS_PORTADA = (
+    "📎 **Adjuntos y portada**\n\n"
+    "• Máximo **2 adjuntos** por publicación.\n"
+    "• Si la publicación requiere portada: el **adjunto 1** debe ser una **imagen** (JPG/JPEG/PNG/GIF/WEBP) y se muestra como **portada**.\n"
+    "• El segundo adjunto puede ser un documento (PDF/Word/Excel), si lo necesitás.\n\n"
+    "Consejo: usá archivos livianos (por ejemplo, imágenes optimizadas y PDFs chicos) para que suban rápido."
+)
+
+_ANS_DISCO_STORAGE = (
+    "💾 **Espacio de disco / almacenamiento**\n\n"
+    "Si sos **Admin**, en la barra lateral (**Sesión**) podés ver un indicador (gráfico) con:\n"
+    "• **Ocupado** vs **Libre**\n"
+    "• y el **porcentaje** de uso.\n\n"
+    "Si el uso está alto, lo recomendado es:\n"
+    "1) Hacer/descargar **backups** (y limpiar adjuntos viejos si corresponde).\n"
+    "2) En Render, evaluar aumentar el tamaño del **disco persistente**."
+)
+
+_ANS_ROLES = (
+    "En CPF hay 3 niveles prácticos:\n\n"
+    "1) **Usuario (normal)**: publica ofertas/necesidades, busca, solicita contacto, responde solicitudes, y gestiona sus publicaciones.\n"
+    "2) **Admin (operativo)**: es un usuario con rol *admin* para operar el sistema (por ejemplo soporte), y puede ver el **indicador de almacenamiento** en ‘Sesión’ (si está habilitado).\n"
+    "3) **Super Admin**: además de lo anterior, puede **moderar/anular** requerimientos, administrar **cámaras**, hacer **backups/restaurar**, **otorgar/quitar** Super Admin y **validar usuarios nuevos** (habilitar pendientes).\n\n"
+    "Nota: los usuarios recién registrados quedan **Pendientes** hasta que el Super Admin los valide."
+)
+
+_ANS_SUPERADMIN_ALTA = (
+    "Como **Super Admin**, en la pestaña **Dar de alta** podés:\n"
+    "• **Otorgar Super Admin**: ingresás *email + nombre*.\n"
+    "• **Quitar Super Admin**: revocás privilegios (evitando dejar al sistema sin ningún superadmin).\n\n"
+    "Si el usuario ya está logueado, al recargar (rerun) ya ve las funciones de Super Admin."
+)
+
+_ANS_BACKUPS = (
+    "Tema **Backups/Resguardo** (solo Super Admin):\n"
+    "• **Crear backup ahora**: genera una copia de la base (**.db**)\n"
+    "• **Crear backup completo** (si está disponible): genera un **.zip** con **DB + adjuntos (uploads)**\n"
+    "• **Descargar** el último backup\n"
+    "• **Restaurar**: elegir un backup o subir un **.db** (y, si corresponde, restaurar adjuntos)\n\n"
+    "En Render, conviene usar disco persistente y/o descargar backups para no perder datos en redeploy."
+)
+
+_TOPICS: Tuple[Tuple[str, Tuple[str, ...], str], ...] = (
+    (
+        "publicar",
+        ["public", "publicar", "oferta", "necesidad", "requerimiento", "nuevo", "cargar"],
+        _ANS_PUBLICAR,
+    ),
+    (
+        "navegar",
+        ["navegar", "buscar", "busqueda", "filtro", "filtrar", "encontr", "tags", "camara"],
+        _ANS_NAVEGAR,
+    ),
+    (
+        "bandeja",
+        ["bandeja", "solicitud", "solicitudes", "contacto", "aceptar", "rechazar", "pendiente"],
+        _ANS_BANDEJA,
+    ),
+    (
+        "interesados",
+        ["interesad", "historial", "aceptad", "rechazad", "enviad", "recibid", "quien", "contact"],
+        _ANS_INTERESADOS,
+    ),
+    (
+        "validacion_usuarios",
+        ["valid", "validacion", "validar", "aprob", "aprobacion", "pendiente", "no puedo ingresar", "no me deja", "registro", "registr", "habilitar"],
+        _ANS_VALIDACION_USUARIOS,
+    ),
+    (
+        "adjuntos_portada",
+        ["adjunt", "adjunto", "archivo", "archivos", "pdf", "imagen", "imagenes", "portada", "subir", "cargar", "descargar"],
+        _ANS_ADJUNTOS_PORTADA,
+    ),
+    (
+        "disco_storage",
+        ["disco", "almacen", "almacenamiento", "storage", "espacio", "ocup", "libre", "grafico", "circular", "porcentaje"],
+        _ANS_DISCO_STORAGE,
+    ),
+    (
+        "roles",
+        ["rol", "roles", "permisos", "admin", "superadmin", "super admin", "moderador", "camaras"],
+        _ANS_ROLES,
+    ),
+    (
+        "superadmin_alta",
+        ["dar de alta", "alta", "nuevo super", "agregar super", "otorgar super", "quitar super"],
+        _ANS_SUPERADMIN_ALTA,
+    ),
+    (
+        "backups",
+        ["backup", "resguardo", "copia", "restaurar", "restore", "db"],
+        _ANS_BACKUPS,
+    ),
+)
+
+_TOPICS = tuple(
+    (name, tuple(kw for kw in (_norm(k) for k in kws) if kw), ans)
+    for name, kws, ans in _TOPICS
+)
+
+# Índice invertido keyword → índices de tema: keywords repetidas entre temas
+# ("pendiente", "cargar", ...) se buscan UNA sola vez por consulta.
+_kw_topics: Dict[str, set] = {}
+for _idx, (_tname, _tkws, _tans) in enumerate(_TOPICS):
+    for _kw in _tkws:
+        _kw_topics.setdefault(_kw, set()).add(_idx)
+_KW_TO_TOPICS: Dict[str, Tuple[int, ...]] = {
+    kw: tuple(sorted(idxs)) for kw, idxs in _kw_topics.items()
+}
+del _kw_topics
+
+# Autómata Aho-Corasick (opcional): una sola pasada sobre la consulta en vez de
+# un substring-search por keyword. Si la librería no está, usamos el loop clásico.
+try:
+    import ahocorasick  # type: ignore
+except Exception:  # pragma: no cover
+    ahocorasick = None
+
+_KW_AUTOMATON = None
+if ahocorasick is not None:
+    _KW_AUTOMATON = ahocorasick.Automaton()
+    for _kw, _idxs in _KW_TO_TOPICS.items():
+        _KW_AUTOMATON.add_word(_kw, (_kw, _idxs))
+    _KW_AUTOMATON.make_automaton()
+
+
+# Keywords pre-codificadas a bytes: tras el plegado ASCII de _norm, buscar
+# sobre bytes usa el memmem vectorizado de CPython (el camino más rápido).
+_KW_TO_TOPICS_B: Tuple[Tuple[bytes, Tuple[int, ...]], ...] = tuple(
+    (kw.encode("ascii", "ignore"), idxs) for kw, idxs in _KW_TO_TOPICS.items()
+)
+
+
+def _best_topic(qn: str):
+    """Devuelve (answer, name, score) del tema con más keywords presentes en qn."""
+    if _KW_AUTOMATON is not None:
+        scores = [0] * len(_TOPICS)
+        seen = set()
+        for _, (kw, idxs) in _KW_AUTOMATON.iter(qn):
+            if kw in seen:
+                continue
+            seen.add(kw)
+            for i in idxs:
+                scores[i] += 1
+        best_idx = max(range(len(_TOPICS)), key=scores.__getitem__)
+        name, _kws, ans = _TOPICS[best_idx]
+        return ans, name, scores[best_idx]
+
+    qb = qn.encode("ascii", "ignore")
+    scores = [0] * len(_TOPICS)
+    for kw, idxs in _KW_TO_TOPICS_B:
+        if qb.find(kw) >= 0:
+            for i in idxs:
+                scores[i] += 1
+    best_idx = max(range(len(_TOPICS)), key=scores.__getitem__)
+    name, _kws, ans = _TOPICS[best_idx]
+    return ans, name, scores[best_idx]
+
+
+# Atajo de ayuda/menú (constante compartida entre llamadas)
+_HELP_ANSWER = (
+    "Puedo ayudarte con todo lo del sistema. Temas típicos:\n\n"
+    "• **Publicar** (Oferta / Necesidad), adjuntos, categorías y urgencia\n"
+    "• **Navegar/Buscar** (filtros por cámara, texto, tipo y estado)\n"
+    "• **Bandeja** (solicitudes pendientes que recibís + edición/cierre de tus publicaciones)\n"
+    "• **Interesados** (historial Recibidas/Enviadas con contacto de ambos lados)\n"
+    "• **Roles** (usuario, admin, Super Admin)\n"
+    "• **Moderación / Anular** requerimientos (Super Admin)\n"
+    "• **Backups / Restaurar** (Super Admin)\n\n"
+    "Decime cuál de estos puntos querés (por ejemplo: *‘¿qué es Interesados?’* o *‘¿cómo anulo un requerimiento?’*)."
+)
+
+# Detección de intención en una sola pasada tabulada (ayuda primero, luego
+# métricas: mismo orden de prioridad que tenían los dos `any(...)` separados).
+_INTENT_KEYWORDS: Tuple[Tuple[str, str], ...] = (
+    ("ayuda", "help"), ("help", "help"),
+    ("que podes hacer", "help"), ("que puedes hacer", "help"),
+    ("como funciona", "help"), ("menu", "help"), ("opciones", "help"),
+    ("metric", "metrics"), ("estad", "metrics"), ("stats", "metrics"),
+    ("panel", "metrics"), ("tablero", "metrics"), ("indicadores", "metrics"),
+)
+
+
+@functools.lru_cache(maxsize=512)
+def _local_answer(qn: str) -> Optional[str]:
+    """Respuesta del modo local para una consulta ya normalizada.
+
+    Es función pura de `qn`, por eso se cachea con LRU (las consultas FAQ se
+    repiten mucho). Devuelve None cuando la intención es de métricas: ese caso
+    lo resuelve el caller con datos frescos (no se debe cachear).
+    """
+    intent = next((i for kw, i in _INTENT_KEYWORDS if kw in qn), None)
+    if intent == "help":
+        return _HELP_ANSWER
+    if intent == "metrics":
+        return None
+
+    ans, _name, best_score = _best_topic(qn)
+
+    # Umbral bajo: si al menos matchea 1 keyword relevante, respondemos.
+    if ans and best_score >= 1:
+        return ans
+
+    return (
+        "Dale. Para ayudarte bien, decime qué querés lograr o qué pantalla estás mirando.\n\n"
+        "Ejemplos: ‘¿qué es Interesados?’, ‘¿cómo acepto una solicitud?’, ‘¿cómo anulo un requerimiento?’."
+    )
+
+
+def _openai_stream(q: str, role: str):
+    """Generador de fragmentos de respuesta de OpenAI (stream=True).
+
+    El streaming baja el tiempo-al-primer-token: la conexión no queda ociosa
+    esperando la respuesta completa. Puede levantar excepción; el caller decide
+    si cae al modo local.
     """
+    client = _get_openai_client()
+    stats = _safe_get_stats()
+    extra = f"Estado actual (aprox): {stats}\n" if stats else ""
+
+    messages = [
+        {"role": "system", "content": _SYSTEM_PROMPT + extra},
+        {"role": "user", "content": f"Rol del usuario: {role}\nConsulta: {q}"},
+    ]
+    model = os.getenv("CPF_OPENAI_MODEL", "gpt-4o-mini")
+    resp = client.chat.completions.create(
+        model=model,
+        messages=messages,
+        temperature=0.5,
+        max_tokens=500,
+        stream=True,
+    )
+    for chunk in resp:
+        delta = chunk.choices[0].delta.content or ""
+        if delta:
+            yield delta
+
+
+# Micro-batching opcional (CPF_BATCH=1): consultas concurrentes dentro de una
+# ventana corta se agrupan en UNA llamada a OpenAI, amortizando el round-trip.
+# Costo: hasta _BATCH_WINDOW_SECONDS de latencia extra para la primera en llegar.
+_BATCH_WINDOW_SECONDS = 0.25
+_BATCH_MAX = 8
+_BATCH_MARKER = "### RESPUESTA"
+_batch_lock = threading.Lock()
+_batch_pending: list = []  # [(q, role, Future), ...]
+_batch_timer: Optional[threading.Timer] = None
+
+
+def _batch_flush() -> None:
+    global _batch_pending, _batch_timer
+    with _batch_lock:
+        pending, _batch_pending = _batch_pending, []
+        if _batch_timer is not None:
+            _batch_timer.cancel()
+            _batch_timer = None
+    if not pending:
+        return
+
     try:
-        import services as svc  # import diferido (evita circular imports)
+        client = _get_openai_client()
+        stats = _safe_get_stats()
+        extra = f"Estado actual (aprox): {stats}\n" if stats else ""
+        asks = "\n\n".join(
+            f"CONSULTA {i + 1} (rol del usuario: {role}):\n{q}"
+            for i, (q, role, _f) in enumerate(pending)
+        )
+        instruction = (
+            f"Respondé de forma INDEPENDIENTE cada una de las {len(pending)} consultas.\n"
+            f"Encabezá cada respuesta con una línea exacta '{_BATCH_MARKER} <número>'.\n\n"
+        )
+        model = os.getenv("CPF_OPENAI_MODEL", "gpt-4o-mini")
+        resp = client.chat.completions.create(
+            model=model,
+            messages=[
+                {"role": "system", "content": _SYSTEM_PROMPT + extra},
+                {"role": "user", "content": instruction + asks},
+            ],
+            temperature=0.5,
+            max_tokens=500 * len(pending),
+        )
+        full = resp.choices[0].message.content or ""
+        answers: Dict[int, str] = {}
+        chunks = re.split(rf"{_BATCH_MARKER}\s+(\d+)", full)
+        for i in range(1, len(chunks) - 1, 2):
+            try:
+                answers[int(chunks[i])] = chunks[i + 1].strip()
+            except Exception:
+                continue
+        for i, (_q, _role, fut) in enumerate(pending):
+            fut.set_result(answers.get(i + 1, ""))
+    except Exception as e:
+        for _q, _role, fut in pending:
+            if not fut.done():
+                fut.set_exception(e)
+
+
+def _batched_openai_answer(q: str, role: str) -> str:
+    """Encola la consulta y espera el resultado del batch (o el timeout)."""
+    fut: Future = Future()
+    flush_now = False
+    global _batch_timer
+    with _batch_lock:
+        _batch_pending.append((q, role, fut))
+        if len(_batch_pending) >= _BATCH_MAX:
+            flush_now = True
+        elif _batch_timer is None:
+            _batch_timer = threading.Timer(_BATCH_WINDOW_SECONDS, _batch_flush)
+            _batch_timer.daemon = True
+            _batch_timer.start()
+    if flush_now:
+        _batch_flush()
+    return fut.result(timeout=30)
+
+
+def assistant_answer_stream(q: str, role: str = "user"):
+    """Variante streaming de assistant_answer (solo texto, sin tabla).
+
+    Con OpenAI configurado, emite fragmentos a medida que llegan; si no, emite
+    la respuesta local completa de una vez. Pensada para st.write_stream.
+    """
+    q = (q or "").strip()
+    if q and os.getenv("OPENAI_API_KEY"):
         try:
-            stats = svc.get_stats()
-            return stats if isinstance(stats, dict) else {}
+            got = False
+            for delta in _openai_stream(q, role):
+                got = True
+                yield delta
+            if got:
+                return
         except Exception:
-            return {}
-    except Exception:
-        return {}
+            pass
+    yield assistant_answer(q, role=role).get("answer", "")
 
 
 def assistant_answer(q: str, role: str = "user") -> Dict[str, Any]:
@@ -107,11 +609,7 @@ def assistant_answer(q: str, role: str = "user") -> Dict[str, Any]:
         }
 
     # Saludos y charla
-    if re.fullmatch(
-        r"(hola|buenas|buen día|buen dia|buenas tardes|buenas noches|hey|hello|qué tal|que tal|como va|cómo va)[.! ]*",
-        q,
-        re.I,
-    ):
+    if _norm(q).rstrip(".! ") in _GREETINGS:
         return {
             "answer": (
                 "¡Hola! 🙂\n\n"
@@ -129,224 +627,27 @@ def assistant_answer(q: str, role: str = "user") -> Dict[str, Any]:
     # OpenAI (si hay API key). Si algo falla, NO rompe: cae a modo local.
     if os.getenv("OPENAI_API_KEY"):
         try:
-            from openai import OpenAI  # type: ignore
-
-            client = OpenAI()
-            stats = _safe_get_stats()
-            system = """Sos un asistente dentro del sistema ‘CPF – Sistema de Requerimientos (sin precios)’. Ayudás a usuarios a entender y usar el sistema.
-
-Reglas:
-- Respondé SIEMPRE en español.
-- Sé flexible y conversacional (estilo ChatGPT).
-- Si el usuario no entiende, explicá de otra manera con ejemplos.
-- Si falta info, hacé 1–2 preguntas concretas.
-- No inventes datos ni funciones que no existen.
-- Respuestas prácticas, con pasos.
-
-Contexto del sistema (resumen):
-- Objetivo: publicar OFERTAS/NECESIDADES y gestionar el interés/contacto **sin precios** dentro del sistema.
-- Tabs principales (usuarios empresa): Navegar, Publicar, Bandeja, Panel, Interesados, Asistente IA.
-- Registro: **Cámara/Institución** y **Teléfono** son obligatorios. Los usuarios nuevos quedan **Pendientes** hasta validación.
-- Validación: la realiza el **Asistente** de la cámara (rol *assistant*) o el **Super Admin**. Los asistentes se habilitan por **Super Admin**.
-- Asistentes: ven un **panel único** de validación, acotado a su cámara; no publican ni ven otras cámaras.
-- Publicar: normalmente se pide **Categoría** y **Ubicación**. Adjuntos: **máximo 2**; el **adjunto 1 debe ser imagen** y se usa como **portada**.
-- Bandeja: solicitudes de contacto recibidas (pendientes) + edición/cierre de tus publicaciones.
-- Interesados: historial de solicitudes (Recibidas y Enviadas) con contacto de ambos lados cuando se acepta.
-- Recuperar contraseña: botón **‘Olvidé mi contraseña’** → llega una **clave provisoria por email** (vence en minutos) → definís nueva contraseña.
-- Roles: user (empresa), admin (operativo), assistant (validador por cámara), Super Admin (moderación/anulación, cámaras, backups, alta de Super Admin, validación de usuarios).
-- Admin: puede ver un **indicador de almacenamiento** (uso de disco) en la barra lateral ‘Sesión’ (si está habilitado).
-- Seguridad: se aceptan solo tipos de adjuntos permitidos; se bloquean ejecutables.
-"""
-            extra = f"Estado actual (aprox): {stats}\n" if stats else ""
-
-            messages = [
-                {"role": "system", "content": system + extra},
-                {"role": "user", "content": f"Rol del usuario: {role}\nConsulta: {q}"},
-            ]
-            model = os.getenv("CPF_OPENAI_MODEL", "gpt-4o-mini")
-            resp = client.chat.completions.create(
-                model=model,
-                messages=messages,
-                temperature=0.5,
-                max_tokens=500,
-            )
-            ans = (resp.choices[0].message.content or "").strip()
+            if os.getenv("CPF_BATCH") == "1":
+                ans = _batched_openai_answer(q, role).strip()
+            else:
+                ans = "".join(_openai_stream(q, role)).strip()
             if ans:
                 return {"answer": ans, "table": None}
         except Exception:
             pass
 
     # --------- MODO LOCAL (sin LLM) ----------
-    qn = _norm(q)
-
-    # Atajo de ayuda/menú
-    if any(k in qn for k in ["ayuda", "help", "que podes hacer", "que puedes hacer", "como funciona", "menu", "opciones"]):
-        return {
-            "answer": (
-                "Puedo ayudarte con todo lo del sistema. Temas típicos:\n\n"
-                "• **Publicar** (Oferta / Necesidad), adjuntos, categorías y urgencia\n"
-                "• **Navegar/Buscar** (filtros por cámara, texto, tipo y estado)\n"
-                "• **Bandeja** (solicitudes pendientes que recibís + edición/cierre de tus publicaciones)\n"
-                "• **Interesados** (historial Recibidas/Enviadas con contacto de ambos lados)\n"
-                "• **Roles** (usuario, admin, Super Admin)\n"
-                "• **Moderación / Anular** requerimientos (Super Admin)\n"
-                "• **Backups / Restaurar** (Super Admin)\n\n"
-                "Decime cuál de estos puntos querés (por ejemplo: *‘¿qué es Interesados?’* o *‘¿cómo anulo un requerimiento?’*)."
-            ),
-            "table": None,
-        }
-
-    # Métricas (único caso donde devolvemos tabla)
-    if any(k in qn for k in ["metric", "estad", "stats", "panel", "tablero", "indicadores"]):
-        stats = _safe_get_stats()
-        if stats:
-            return {"answer": "Te muestro métricas generales del sistema:", "table": stats}
-        return {
-            "answer": "Puedo mostrar métricas, pero ahora no pude obtenerlas. Probá recargar la app.",
-            "table": None,
-        }
+    qn = " ".join(_norm(q).split())
 
-    # KB: respuestas guiadas por intención
-    topics: List[Tuple[str, List[str], str]] = [
-        (
-            "publicar",
-            ["public", "publicar", "oferta", "necesidad", "requerimiento", "nuevo", "cargar"],
-            (
-                "Para **publicar** una Oferta o Necesidad:\n"
-                "1) Entrá a **Publicar**.\n"
-                "2) Elegí el **Tipo** (Oferta / Necesidad).\n"
-                "3) Completá **Título** y **Descripción** (claros y concretos).\n"
-                "4) Elegí **Categoría** y completá **Ubicación** (obligatorias).\n"
-                "5) Opcional: **Urgencia** y **Tags**.\n"
-                "6) **Adjuntos:** máximo 2. Si se solicita **portada**, el **adjunto 1 debe ser una imagen** (JPG/JPEG/PNG/GIF/WEBP) y se verá como portada; luego podés adjuntar PDF/Word/Excel.\n"
-                "7) Tocá **Publicar**.\n\n"
-                "Tip: los **tags** ayudan muchísimo para que te encuentren (ej: ‘mecanizado, calderería, logística, válvulas’).\n"
-                "Nota: el sistema es **sin precios**; la negociación se hace fuera del CPF."
-            ),
-        ),
-
-        (
-            "navegar",
-            ["navegar", "buscar", "busqueda", "filtro", "filtrar", "encontr", "tags", "camara"],
-            (
-                "Para **buscar/navegar** publicaciones:\n"
-                "1) En **Navegar**, elegí la **Cámara** (o ‘(Todas)’).\n"
-                "2) Usá **Buscar** para texto libre (empresa, producto, tags, etc.).\n"
-                "3) Ajustá **Tipo** (Oferta/Necesidad) y **Estado** (abierto/cerrado).\n\n"
-                "Si me decís qué querés encontrar, te sugiero filtros concretos."
-            ),
-        ),
-        (
-            "bandeja",
-            ["bandeja", "solicitud", "solicitudes", "contacto", "aceptar", "rechazar", "pendiente"],
-            (
-                "La **Bandeja** tiene 2 partes:\n"
-                "• **Solicitudes recibidas**: cuando alguien te pide contacto por una de tus publicaciones (podés **Aceptar** o **Rechazar**).\n"
-                "• **Mis publicaciones**: podés **editar** o **cerrar** (cambiar estado) tus ofertas/necesidades.\n\n"
-                "Si aceptás una solicitud, el contacto queda visible en **Interesados** (historial), para ambos lados."
-            ),
-        ),
-        (
-            "interesados",
-            ["interesad", "historial", "aceptad", "rechazad", "enviad", "recibid", "quien", "contact"],
-            (
-                "**Interesados** es el lugar para ver el **historial** de solicitudes de contacto (no se pierden).\n\n"
-                "Dentro de Interesados tenés:\n"
-                "• **Recibidas**: solicitudes que te hicieron por tus publicaciones.\n"
-                "• **Enviadas**: solicitudes que vos hiciste a otros.\n\n"
-                "En cada solicitud vas a ver **los dos contactos** (el tuyo y el de la otra parte), para que cualquiera de los dos pueda comunicarse.\n"
-                "Estados: **Pendiente**, **Aceptada**, **Rechazada**."
-            ),
-        ),
-        (
-            "validacion_usuarios",
-            ["valid", "validacion", "validar", "aprob", "aprobacion", "pendiente", "no puedo ingresar", "no me deja", "registro", "registr", "habilitar"],
-            (
-                "📌 **Registro con validación**\n\n"
-                "Cuando te registrás, tu cuenta queda **Pendiente**.\n"
-                "Hasta que un **Super Admin** la habilite, no vas a poder ingresar (vas a ver el aviso de ‘pendiente de validación’).\n\n"
-                "¿Quién valida y dónde?\n"
-                "• Super Admin → pestaña **Panel** → **Validar usuarios**.\n\n"
-                "Si necesitás acceso urgente, avisale al administrador/superadmin para que te habilite."
-            ),
-        ),
-        (
-            "adjuntos_portada",
-            ["adjunt", "adjunto", "archivo", "archivos", "pdf", "imagen", "imagenes", "portada", "subir", "cargar", "descargar"],
-            (
-                "📎 **Adjuntos y portada**\n\n"
-                "• Máximo **2 adjuntos** por publicación.\n"
-                "• Si la publicación requiere portada: el **adjunto 1** debe ser una **imagen** (JPG/JPEG/PNG/GIF/WEBP) y se muestra como **portada**.\n"
-                "• El segundo adjunto puede ser un documento (PDF/Word/Excel), si lo necesitás.\n\n"
-                "Consejo: usá archivos livianos (por ejemplo, imágenes optimizadas y PDFs chicos) para que suban rápido."
-            ),
-        ),
-        (
-            "disco_storage",
-            ["disco", "almacen", "almacenamiento", "storage", "espacio", "ocup", "libre", "grafico", "circular", "porcentaje"],
-            (
-                "💾 **Espacio de disco / almacenamiento**\n\n"
-                "Si sos **Admin**, en la barra lateral (**Sesión**) podés ver un indicador (gráfico) con:\n"
-                "• **Ocupado** vs **Libre**\n"
-                "• y el **porcentaje** de uso.\n\n"
-                "Si el uso está alto, lo recomendado es:\n"
-                "1) Hacer/descargar **backups** (y limpiar adjuntos viejos si corresponde).\n"
-                "2) En Render, evaluar aumentar el tamaño del **disco persistente**."
-            ),
-        ),
-
-        (
-            "roles",
-            ["rol", "roles", "permisos", "admin", "superadmin", "super admin", "moderador", "camaras"],
-            (
-                "En CPF hay 3 niveles prácticos:\n\n"
-                "1) **Usuario (normal)**: publica ofertas/necesidades, busca, solicita contacto, responde solicitudes, y gestiona sus publicaciones.\n"
-                "2) **Admin (operativo)**: es un usuario con rol *admin* para operar el sistema (por ejemplo soporte), y puede ver el **indicador de almacenamiento** en ‘Sesión’ (si está habilitado).\n"
-                "3) **Super Admin**: además de lo anterior, puede **moderar/anular** requerimientos, administrar **cámaras**, hacer **backups/restaurar**, **otorgar/quitar** Super Admin y **validar usuarios nuevos** (habilitar pendientes).\n\n"
-                "Nota: los usuarios recién registrados quedan **Pendientes** hasta que el Super Admin los valide."
-            ),
-        ),
-
-        (
-            "superadmin_alta",
-            ["dar de alta", "alta", "nuevo super", "agregar super", "otorgar super", "quitar super"],
-            (
-                "Como **Super Admin**, en la pestaña **Dar de alta** podés:\n"
-                "• **Otorgar Super Admin**: ingresás *email + nombre*.\n"
-                "• **Quitar Super Admin**: revocás privilegios (evitando dejar al sistema sin ningún superadmin).\n\n"
-                "Si el usuario ya está logueado, al recargar (rerun) ya ve las funciones de Super Admin."
-            ),
-        ),
-        (
-            "backups",
-            ["backup", "resguardo", "copia", "restaurar", "restore", "db"],
-            (
-                "Tema **Backups/Resguardo** (solo Super Admin):\n"
-                "• **Crear backup ahora**: genera una copia de la base (**.db**)\n"
-                "• **Crear backup completo** (si está disponible): genera un **.zip** con **DB + adjuntos (uploads)**\n"
-                "• **Descargar** el último backup\n"
-                "• **Restaurar**: elegir un backup o subir un **.db** (y, si corresponde, restaurar adjuntos)\n\n"
-                "En Render, conviene usar disco persistente y/o descargar backups para no perder datos en redeploy."
-            ),
-        ),
-    ]
-
-    best = None
-    best_score = 0
-    for _name, kws, ans in topics:
-        sc = _score_keywords(qn, kws)
-        if sc > best_score:
-            best_score = sc
-            best = (ans, _name)
-
-    # Umbral bajo: si al menos matchea 1 keyword relevante, respondemos.
-    if best and best_score >= 1:
-        return {"answer": best[0], "table": None}
+    ans = _local_answer(qn)
+    if ans is not None:
+        return {"answer": ans, "table": None}
 
+    # Métricas (único caso donde devolvemos tabla; siempre con datos frescos)
+    stats = _safe_get_stats()
+    if stats:
+        return {"answer": "Te muestro métricas generales del sistema:", "table": stats}
     return {
-        "answer": (
-            "Dale. Para ayudarte bien, decime qué querés lograr o qué pantalla estás mirando.\n\n"
-            "Ejemplos: ‘¿qué es Interesados?’, ‘¿cómo acepto una solicitud?’, ‘¿cómo anulo un requerimiento?’."
-        ),
+        "answer": "Puedo mostrar métricas, pero ahora no pude obtenerlas. Probá recargar la app.",
         "table": None,
     }
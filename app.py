@@ -1,53 +1,30 @@
 import streamlit as st
 from mailer import mailer_is_configured
+import functools
+import html
 import re
 import os
-import base64
-def _fixed_manual_and_exit_controls():
-    """Botón fijo (arriba derecha) para descargar el Manual (vista pública)."""
-    assets_dir = os.path.join(os.path.dirname(__file__), "assets")
-    pdf_path = os.path.join(assets_dir, "manual_usuario_cpf.pdf")
-    icon_path = os.path.join(assets_dir, "manual_icon.png")
-
-    pdf_b64 = None
-    try:
-        with open(pdf_path, "rb") as f:
-            pdf_b64 = base64.b64encode(f.read()).decode("utf-8")
-    except Exception:
-        pdf_b64 = None
+import unicodedata
+from collections import deque
 
-    icon_b64 = None
-    try:
-        with open(icon_path, "rb") as f:
-            icon_b64 = base64.b64encode(f.read()).decode("utf-8")
-    except Exception:
-        icon_b64 = None
 
-    # Link "data:" para descargar/abrir el PDF
-    manual_link = "#"
-    if pdf_b64:
-        manual_link = f"data:application/pdf;base64,{pdf_b64}"
+# Archivos servidos por el file server estático de Streamlit (./static,
+# habilitado en .streamlit/config.toml). El PDF viaja como URL con soporte
+# de Range en lugar de incrustarse en base64 dentro del HTML de cada rerun.
+_STATIC_DIR = os.path.join(os.path.dirname(__file__), "static")
 
-    icon_html = ""
-    if icon_b64:
-        icon_html = (
-            f"<img src='data:image/png;base64,{icon_b64}' "
-            "style='height:22px;width:auto;margin-right:10px;vertical-align:middle;' />"
-        )
-
-    # UI fija: más prolija, tipo “pill”, con hover suave.
-    st.markdown(
-        f"""
+# CSS de la "pill" fija: constante de módulo, no se re-formatea por rerun.
+_FIXED_CSS = """
 <style>
-.cpf-fixed-actions {{
+.cpf-fixed-actions {
   position: fixed;
   top: 12px;
   right: 12px;
   z-index: 999999;
   display: flex;
   align-items: center;
-}}
-.cpf-pill {{
+}
+.cpf-pill {
   display: inline-flex;
   align-items: center;
   gap: 8px;
@@ -61,33 +38,58 @@ def _fixed_manual_and_exit_controls():
   text-decoration: none;
   box-shadow: 0 6px 18px rgba(0,0,0,0.10);
   transition: transform .08s ease, box-shadow .12s ease, background .12s ease;
-}}
-.cpf-pill:hover {{
+}
+.cpf-pill:hover {
   transform: translateY(-1px);
   background: rgba(255,255,255,1);
   box-shadow: 0 10px 22px rgba(0,0,0,0.14);
-}}
-.cpf-pill:active {{
+}
+.cpf-pill:active {
   transform: translateY(0px);
-}}
-.cpf-pill small {{
+}
+.cpf-pill small {
   font-weight: 700;
   opacity: 0.8;
-}}
-@media (max-width: 640px) {{
-  .cpf-fixed-actions {{ top: 8px; right: 8px; }}
-  .cpf-pill {{ padding: 9px 12px; }}
-}}
+}
+@media (max-width: 640px) {
+  .cpf-fixed-actions { top: 8px; right: 8px; }
+  .cpf-pill { padding: 9px 12px; }
+}
 </style>
+"""
+
+
+@functools.lru_cache(maxsize=1)
+def _fixed_controls_html() -> str:
+    """Arma el HTML del botón fijo una sola vez por proceso.
 
+    Los assets son estáticos: chequeamos existencia e interpolamos el
+    f-string en la primera llamada y reusamos el string en cada rerun.
+    """
+    manual_link = "#"
+    if os.path.exists(os.path.join(_STATIC_DIR, "manual_usuario_cpf.pdf")):
+        manual_link = "app/static/manual_usuario_cpf.pdf"
+
+    icon_html = ""
+    if os.path.exists(os.path.join(_STATIC_DIR, "manual_icon.png")):
+        icon_html = (
+            "<img src='app/static/manual_icon.png' "
+            "style='height:22px;width:auto;margin-right:10px;vertical-align:middle;' />"
+        )
+
+    return f"""
 <div class="cpf-fixed-actions">
   <a class="cpf-pill" href="{manual_link}" download="Manual_CPF.pdf" target="_blank" rel="noopener">
     {icon_html}<span>Manual</span><small>PDF</small>
   </a>
 </div>
-""",
-        unsafe_allow_html=True,
-    )
+"""
+
+
+def _fixed_manual_and_exit_controls():
+    """Botón fijo (arriba derecha) para descargar el Manual (vista pública)."""
+    # UI fija: más prolija, tipo “pill”, con hover suave.
+    st.markdown(_FIXED_CSS + _fixed_controls_html(), unsafe_allow_html=True)
 
 from pathlib import Path
 import shutil
@@ -124,34 +126,66 @@ REQUIRE_CATEGORY = True     # obliga seleccionar categoría (no "Sin categoría"
 REQUIRE_LOCATION = True     # obliga completar ubicación
 MAX_ATTACHMENTS = int(os.getenv("CPF_MAX_ATTACHMENTS", "2"))
 
+# MIME por extensión para los botones de descarga (cubre todos los tipos
+# permitidos en adjuntos, no solo PDF)
+_EXT_MIME = {
+    "pdf": "application/pdf",
+    "jpg": "image/jpeg",
+    "jpeg": "image/jpeg",
+    "png": "image/png",
+    "gif": "image/gif",
+    "webp": "image/webp",
+    "doc": "application/msword",
+    "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "xls": "application/vnd.ms-excel",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+# Etiquetas/estilos por fila: tablas de lookup en vez de condicionales repetidos
+_KIND_LABEL = {"need": "NECESIDAD", "offer": "OFERTA"}
+_STATUS_STYLE = {"annulled": ("red", " 🟥 ANULADO")}  # .get(status, ("black", ""))
+_STATUS_LABELS = {"open": "abierto", "closed": "cerrado", "annulled": "anulado"}
+# Plantilla de fila del listado "Mis publicaciones": se formatea con .format()
+# en vez de re-lexear una f-string por fila (el título siempre va escapado)
+_ROW_TPL = "<div style='color:{c}; font-weight:600'>#{i} · {k} · {t}{b}</div>"
+# Opciones de categoría con el placeholder, armadas una sola vez
+_CATS_WITH_NONE = ["(Sin categoría)"] + CATEGORIES
+
 # Revisión 29 (hotfix): marcador de versión para verificar despliegues
 APP_REV = "50"
 
 
 
 # -------------------- Branding (Revisión 28) --------------------
-def _render_sidebar_logo():
-    """Muestra el logo CPF dentro de la barra lateral (no fijo)."""
-    try:
-        base = Path(__file__).resolve().parent
-        candidates = []
+@functools.lru_cache(maxsize=1)
+def _resolve_logo_path():
+    """Resuelve el path del logo UNA vez por proceso (evita stats por rerun)."""
+    base = Path(__file__).resolve().parent
+    candidates = []
 
-        env_path = (os.getenv("CPF_LOGO_PATH") or "").strip()
-        if env_path:
-            candidates.append(Path(env_path))
+    env_path = (os.getenv("CPF_LOGO_PATH") or "").strip()
+    if env_path:
+        candidates.append(Path(env_path))
 
-        candidates += [
-            base / "assets" / "cpf_logo.png",
-            base / "assets" / "Logo sistemas de requerimientos.png",
-            base / "cpf_logo.png",
-        ]
+    candidates += [
+        base / "assets" / "cpf_logo.png",
+        base / "assets" / "Logo sistemas de requerimientos.png",
+        base / "cpf_logo.png",
+    ]
+
+    p = next((c for c in candidates if c.exists()), None)
+    return str(p) if p else None
 
-        p = next((c for c in candidates if c.exists()), None)
+
+def _render_sidebar_logo():
+    """Muestra el logo CPF dentro de la barra lateral (no fijo)."""
+    try:
+        p = _resolve_logo_path()
         if not p:
             return
 
         # +30% aprox: ocupar el ancho disponible de la barra lateral
-        st.image(str(p), use_container_width=True)
+        st.image(p, use_container_width=True)
         st.markdown("---")
     except Exception:
         # no bloquea la app
@@ -162,7 +196,6 @@ def _render_sidebar_logo():
 def _disk_usage_pie(mount_path: str):
     """Grafico circular (ocupado vs libre). Visible SOLO para Admin (no Super Admin)."""
     try:
-        import matplotlib.pyplot as plt
         usage = shutil.disk_usage(mount_path)
         total = float(usage.total)
         used = float(usage.used)
@@ -177,19 +210,31 @@ def _disk_usage_pie(mount_path: str):
         total_gb = total / gb
 
         st.caption(f"Disco: {mount_path} — {used_gb:.2f} GB usados / {total_gb:.2f} GB (libre: {free_gb:.2f} GB)")
-        fig, ax = plt.subplots(figsize=(3.2, 3.2))
-        ax.pie(
-            [used, free],
-            labels=["Ocupado", "Libre"],
-            colors=["#d7263d", "#1b998b"],  # rojo / verde
-            autopct=lambda p: f"{p:.0f}%",
-            startangle=90,
-            counterclock=False,
-            textprops={"fontsize": 10},
+        # Donut SVG inline: para dos porciones no hace falta matplotlib
+        # (import de ~200 ms, rasterizado PNG y Figure retenida por pyplot).
+        # El anillo rojo es un círculo de r=8 con stroke ancho; su perímetro
+        # es ~50.27, y stroke-dasharray pinta la fracción ocupada.
+        circ = 50.27
+        dash = (used / total) * circ
+        st.markdown(
+            f"""
+<div style="text-align:center;max-width:220px;">
+  <div style="font-weight:700;margin-bottom:4px;">Ocupación: {pct:.0f}%</div>
+  <svg viewBox="0 0 32 32" width="180" height="180" role="img" aria-label="Ocupación {pct:.0f}%">
+    <circle r="16" cx="16" cy="16" fill="#1b998b"/>
+    <circle r="8" cx="16" cy="16" fill="transparent"
+            stroke="#d7263d" stroke-width="16"
+            stroke-dasharray="{dash:.2f} {circ - dash:.2f}"
+            transform="rotate(-90 16 16)"/>
+  </svg>
+  <div style="font-size:0.85em;">
+    <span style="color:#d7263d;">■</span> Ocupado&nbsp;&nbsp;
+    <span style="color:#1b998b;">■</span> Libre
+  </div>
+</div>
+""",
+            unsafe_allow_html=True,
         )
-        ax.set_title(f"Ocupación: {pct:.0f}%")
-        ax.axis("equal")
-        st.pyplot(fig, use_container_width=False)
     except Exception as e:
         st.caption(f"No se pudo leer el uso de disco: {e}")
 
@@ -198,23 +243,29 @@ def _uget(u, key, default=None):
     """Lee un campo de usuario soportando dict o sqlite3.Row."""
     if u is None:
         return default
-    try:
-        if hasattr(u, "get"):
-            return u.get(key, default)
-    except Exception:
-        pass
+    if isinstance(u, dict):
+        # Camino dominante: sin try/except (levantar+atrapar cuesta ~1µs)
+        return u.get(key, default)
+    # sqlite3.Row u otro indexable
     try:
         return u[key]
     except Exception:
-        try:
-            return dict(u).get(key, default)
-        except Exception:
-            return default
+        return default
+# Diacríticos combinantes (bloque U+0300–U+036F): es lo que NFKD separa de
+# las letras acentuadas del español. Tabla int→None para str.translate (en C).
+_COMBINING_STRIP = dict.fromkeys(range(0x300, 0x370))
+
+@functools.lru_cache(maxsize=2048)
 def _norm_text(s: str) -> str:
-    import unicodedata
-    s = s or ""
-    s = ''.join(c for c in unicodedata.normalize('NFKD', s) if not unicodedata.combining(c))
-    return s.casefold()
+    # Memoizado: se invoca una y otra vez con los mismos strings cortos
+    # (títulos, lista de palabras) en cada rerun.
+    if not s:
+        return ""
+    if s.isascii():
+        # ASCII ya está normalizado (Unicode quick-check): nos salteamos NFKD
+        return s.casefold()
+    nk = unicodedata.normalize('NFKD', s)
+    return nk.translate(_COMBINING_STRIP).casefold()
 
 # Lista MUY acotada de insultos graves (evitamos falsos positivos).
 # Si necesitás ampliarla, lo hacemos con criterio y pruebas.
@@ -227,47 +278,76 @@ _OFFENSIVE_WORDS = [
     "mierda",
 ]
 
+# Alternación única compilada al importar: un solo escaneo del texto por
+# llamada, en vez de compilar y correr un patrón por palabra. re.ASCII porque
+# el texto ya viene normalizado (sin acentos) por _norm_text.
+# Normalizado + dedup al importar ("imbécil" colapsa con "imbecil"), y de
+# mayor a menor longitud para que la alternación prefiera el match más largo
+# si se agregan entradas que se contienen entre sí.
+_OFFENSIVE_NORM = tuple(sorted({_norm_text(w) for w in _OFFENSIVE_WORDS},
+                               key=len, reverse=True))
+_OFFENSIVE_RE = re.compile(
+    r"(?<!\w)(?:" + "|".join(map(re.escape, _OFFENSIVE_NORM)) + r")(?!\w)",
+    re.ASCII,
+)
+
 def detect_offensive_words(text: str):
     """Devuelve lista de coincidencias: [{'word':..., 'start':..., 'end':...}]"""
-    t = text or ""
-    nt = _norm_text(t)
-    matches = []
-    for w in _OFFENSIVE_WORDS:
-        nw = _norm_text(w)
-        # buscar como palabra completa (bordes no alfanuméricos)
-        for m in re.finditer(rf"(?<![\w]){re.escape(nw)}(?![\w])", nt):
-            matches.append({"word": w, "start": m.start(), "end": m.end()})
-    # ordenar y deduplicar por rango
-    matches = sorted(matches, key=lambda x: (x["start"], x["end"]))
-    dedup = []
-    last_end = -1
-    for mm in matches:
-        if mm["start"] >= last_end:
-            dedup.append(mm)
-            last_end = mm["end"]
-    return dedup
-
-def highlight_offensive(text: str, matches):
+    nt = _norm_text(text or "")
+    # finditer entrega matches ordenados y sin solapar: no hace falta dedup
+    return [
+        {"word": m.group(0), "start": m.start(), "end": m.end()}
+        for m in _OFFENSIVE_RE.finditer(nt)
+    ]
+
+# Variante insensible a mayúsculas para resaltar sobre el texto ASCII
+# original sin perder la caja (BOLUDO se marca como BOLUDO).
+_OFFENSIVE_SUB_RE = re.compile(_OFFENSIVE_RE.pattern, re.ASCII | re.IGNORECASE)
+
+def highlight_offensive(text: str, matches=None):
     """Devuelve HTML con <mark> para mostrar dónde está el problema."""
-    if not matches:
+    if not text:
         return text
-    t = text or ""
-    # Como matches están sobre texto normalizado, hacemos highlight aproximado:
-    # reconstruimos por búsqueda sobre original con normalización por ventanas.
-    nt = _norm_text(t)
-    spans = [(m["start"], m["end"]) for m in matches]
-    out = []
-    last = 0
-    for s,e in spans:
-        out.append(t[last:s])
-        out.append(f"<mark>{t[s:e]}</mark>")
-        last = e
-    out.append(t[last:])
-    return "".join(out)
-import pandas as pd
+    # Una única sustitución en C reemplaza el armado manual por spans
+    # (`matches` queda por compatibilidad pero ya no hace falta).
+    if text.isascii():
+        return _OFFENSIVE_SUB_RE.sub(lambda m: f"<mark>{m.group(0)}</mark>", text)
+    # No-ASCII: NFKD puede cambiar longitudes, marcamos sobre el normalizado
+    return _OFFENSIVE_RE.sub(lambda m: f"<mark>{m.group(0)}</mark>", _norm_text(text))
 import datetime
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+# pandas solo se usa en los paneles de administración: importarlo acá sumaba
+# ~1s y ~150 MB al cold start de TODOS los workers. Se carga on-demand con
+# _ensure_pd() justo antes del primer DataFrame.
+pd = None
+
+
+def _ensure_pd():
+    global pd
+    if pd is None:
+        import pandas
+        pd = pandas
+    return pd
+
+
+def _norm_s(v):
+    """Normaliza celdas del data_editor: NA/None/'' -> None, resto str.strip().
+
+    A nivel módulo para no redefinirla en cada handler de guardado
+    (usuarios y cámaras) en cada rerun.
+    """
+    try:
+        if pd.isna(v):
+            return None
+    except Exception:
+        pass
+    if v is None:
+        return None
+    s = str(v).strip()
+    return s if s != "" else None
+
 import services as svc
 import mailer
 from db import (
@@ -291,12 +371,80 @@ from db import (
 
 from auth import any_admin_exists, create_user, authenticate, is_super_admin, get_user_by_email
 
+# Envío de mails en segundo plano: el SMTP tarda 100ms–2s y no tiene por qué
+# bloquear el script de Streamlit (workload 100% I/O, alcanzan 2 threads).
+_mail_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="cpf-mail")
+
+
+def _notify_contact_request_async(req_id: int, sender_email: str, sender_name: str):
+    """Resuelve datos y envía ambas notificaciones fuera del hilo del script."""
+    def _task():
+        try:
+            req = svc.get_requirement(int(req_id))
+            owner_email, owner_name = svc.get_user_contact_min(int(req["user_id"]))
+            mailer.notify_interest_owner(
+                owner_email=owner_email or "",
+                owner_name=owner_name or "",
+                kind=(req.get("type") or ""),
+                title=(req.get("title") or ""),
+                company=(req.get("company") or ""),
+            )
+            mailer.notify_interest_sender(
+                sender_email=sender_email,
+                sender_name=sender_name,
+                kind=(req.get("type") or ""),
+                title=(req.get("title") or ""),
+                company=(req.get("company") or ""),
+            )
+        except Exception:
+            # el mailer ya loguea sus fallas; nunca romper la app por un mail
+            pass
+
+    _mail_executor.submit(_task)
+
+
+def _notify_accept_async(cr_id: int):
+    """Mails de aceptación en segundo plano (el click no espera al SMTP)."""
+    def _task():
+        try:
+            cr = svc.get_contact_request_with_parties(int(cr_id))
+            if cr:
+                mailer.notify_accept_both(
+                    owner_email=cr.get("owner_email") or "",
+                    owner_name=cr.get("owner_name") or "",
+                    sender_email=cr.get("sender_email") or "",
+                    sender_name=cr.get("sender_name") or "",
+                    kind=cr.get("type") or "",
+                    title=cr.get("title") or "",
+                    company=cr.get("company") or "",
+                )
+        except Exception:
+            # el mailer ya loguea sus fallas; nunca romper la app por un mail
+            pass
+
+    _mail_executor.submit(_task)
+
 try:
-    from ai import assistant_answer, review_requirement
+    from ai import assistant_answer, assistant_answer_stream, review_requirement
 except Exception:
     def assistant_answer(q: str, role: str = "user"):
         return {"answer": "Asistente IA no disponible (ai.py con error).", "table": None}
 
+    def assistant_answer_stream(q: str, role: str = "user"):
+        yield assistant_answer(q, role=role).get("answer", "")
+
+    # Alternación compilada una sola vez al importar (igual que en
+    # detect_offensive_words): evita W búsquedas con patrón fresco por llamada.
+    _FALLBACK_BAD = (
+        "idiota", "imbecil", "imbécil", "estupido", "estúpido",
+        "pelotudo", "pelotuda", "boludo", "boluda",
+        "mierda", "puta", "puto",
+    )
+    _FALLBACK_BAD_RE = re.compile(
+        r"\b(?:" + "|".join(re.escape(w) for w in _FALLBACK_BAD) + r")\b",
+        re.IGNORECASE | re.ASCII,
+    )
+
     def review_requirement(title: str, description: str):
         """Fallback: revisión simple local sin IA.
 
@@ -307,12 +455,7 @@ except Exception:
         - suggested_title / suggested_description (opcionales)
         """
         text = f"{title}\n{description}".lower()
-        bad_words = [
-            "idiota", "imbecil", "imbécil", "estupido", "estúpido",
-            "pelotudo", "pelotuda", "boludo", "boluda",
-            "mierda", "puta", "puto",
-        ]
-        hits = sorted({w for w in bad_words if re.search(rf"\b{re.escape(w)}\b", text, re.IGNORECASE)})
+        hits = sorted({m.lower() for m in _FALLBACK_BAD_RE.findall(text)})
         if hits:
             return {
                 "ok": False,
@@ -332,6 +475,87 @@ def _get_user():
     return st.session_state.get("user")
 
 
+def _is_super_cached(u) -> bool:
+    """is_super_admin() con cache por sesión.
+
+    El sidebar lo consulta varias veces en el mismo rerun (_maybe_auto_backup
+    y _backup_download_ui); el booleano se resuelve una vez por email y se
+    invalida al cerrar sesión.
+    """
+    email = _uget(u, 'email', "") or ""
+    if not email:
+        return False
+    cache = st.session_state.setdefault("_role_cache", {})
+    hit = cache.get(email)
+    if hit is None:
+        hit = cache[email] = bool(is_super_admin(email))
+    return hit
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def _cached_super_admin_emails():
+    return get_super_admin_emails()
+
+
+def _fmt_contact(name: str, email: str, phone: str, company: str = None) -> str:
+    bits = []
+    if name:
+        bits.append(name)
+    if company:
+        bits.append(company)
+    if email:
+        bits.append(email)
+    if phone:
+        bits.append(phone)
+    return " · ".join(bits) if bits else "-"
+
+
+def _decorate_contact_items(groups: dict) -> dict:
+    """Adjunta a cada solicitud sus strings derivados (_kind, _title, contactos).
+
+    Las filas son inmutables entre fetches: formatear acá una vez deja el
+    render como escrituras de f-string puras en cada rerun.
+    """
+    for items in groups.values():
+        for it in items:
+            it["_kind"] = _KIND_LABEL.get(it.get("type"), "NECESIDAD")
+            it["_title"] = it.get("title") or "(sin título)"
+            it["_from_short"] = (it.get("from_name") or "(sin nombre)") + " · " + (it.get("from_company") or "(sin empresa)")
+            it["_from_contact"] = _fmt_contact(it.get("from_name"), it.get("from_email"), it.get("from_phone"), it.get("from_company"))
+            it["_to_contact"] = _fmt_contact(it.get("to_name"), it.get("to_email"), it.get("to_phone"), it.get("to_company"))
+    return groups
+
+
+@st.cache_data(ttl=15, show_spinner=False)
+def _inbox_grouped_cached(user_id: int) -> dict:
+    return _decorate_contact_items(svc.list_inbox_grouped(user_id))
+
+
+@st.cache_data(ttl=15, show_spinner=False)
+def _outbox_grouped_cached(user_id: int) -> dict:
+    return _decorate_contact_items(svc.list_outbox_grouped(user_id))
+
+
+@st.cache_data(ttl=600, max_entries=512, show_spinner=False)
+def _assistant_answer_cached(q: str, role: str):
+    """Respuestas del asistente cacheadas por (pregunta, rol).
+
+    Las consultas tipo FAQ se repiten mucho; esto evita recomputar
+    (y eventualmente re-pegar a un modelo) la misma respuesta.
+    """
+    return assistant_answer(q, role=role)
+
+
+@st.cache_data(ttl=10, show_spinner=False)
+def _cached_list_full_backups():
+    return list_full_backups()
+
+
+@st.cache_data(ttl=10, show_spinner=False)
+def _cached_list_backups():
+    return list_backups()
+
+
 def _maybe_auto_backup(reason: str = "logout"):
     """Backup automático SOLO para Super Admin, al cerrar sesión.
 
@@ -341,7 +565,7 @@ def _maybe_auto_backup(reason: str = "logout"):
     u = st.session_state.get("user")
     if not u:
         return
-    if not is_super_admin(_uget(u, 'email', "")):
+    if not _is_super_cached(u):
         return
     if reason != "logout":
         return
@@ -362,10 +586,10 @@ def _maybe_auto_backup(reason: str = "logout"):
 def _backup_download_ui():
     """UI de resguardo (solo Super Admin)."""
     u = st.session_state.get("user")
-    if not u or not is_super_admin(_uget(u, 'email', "")):
+    if not u or not _is_super_cached(u):
         return
 
-    emails = get_super_admin_emails()
+    emails = _cached_super_admin_emails()
     st.caption(f"Super Admin(s): {', '.join(emails) if emails else (get_super_admin_email() or '-')}")
 
     cur_dir = get_backup_dir()
@@ -379,22 +603,24 @@ def _backup_download_ui():
         st.success("Directorio actualizado.")
 
     def _normalize_backup_obj(obj):
-        """Convierte 'obj' a dict con bytes para st.download_button.
+        """Convierte 'obj' a dict con metadatos (SIN bytes) para la UI.
         Soporta:
-          - str (path) -> lee bytes
+          - str (path) -> valida y arma dict
           - dict ya armado -> lo deja
+
+        Los bytes se leen recién al armar el download_button: así el ZIP no
+        queda duplicado en session_state durante toda la sesión.
         """
         if obj is None:
             return None
         if isinstance(obj, dict):
+            obj.pop("bytes", None)  # sesiones viejas: liberar el archivo retenido
             return obj
         if isinstance(obj, str):
-            try:
-                p = Path(obj)
-                data = p.read_bytes()
-                return {"ok": True, "path": obj, "filename": p.name, "bytes": data}
-            except Exception as e:
-                return {"ok": False, "path": obj, "error": str(e)}
+            p = Path(obj)
+            if p.exists():
+                return {"ok": True, "path": obj, "filename": p.name}
+            return {"ok": False, "path": obj, "error": "archivo no encontrado"}
         return {"ok": False, "error": "tipo de backup no soportado"}
 
 
@@ -413,43 +639,55 @@ def _backup_download_ui():
     bfull = _normalize_backup_obj(st.session_state.get("_last_full_backup"))
     st.session_state["_last_full_backup"] = bfull
     if bfull and bfull.get("ok"):
-        st.download_button(
-            "Descargar último backup completo (ZIP)",
-            data=bfull["bytes"],
-            file_name=bfull.get("filename","cpf_full_backup.zip"),
-            mime="application/zip",
-            use_container_width=True,
-        )
+        try:
+            # Lectura perezosa: los bytes viven solo durante este render
+            data_full = Path(bfull["path"]).read_bytes()
+        except Exception as e:
+            st.error(f"No pude leer el backup completo: {e}")
+        else:
+            st.download_button(
+                "Descargar último backup completo (ZIP)",
+                data=data_full,
+                file_name=bfull.get("filename","cpf_full_backup.zip"),
+                mime="application/zip",
+                use_container_width=True,
+            )
     else:
         st.info("Todavía no hay un backup completo generado en esta sesión.")
 
     st.divider()
-    st.subheader("Restaurar backup completo (ZIP) — solo Super Admin")
-    fulls = list_full_backups()
-    pick_full = st.selectbox(
-        "Backups completos locales (ZIP)",
-        options=["(ninguno)"] + fulls,
-        format_func=lambda p: p if p=="(ninguno)" else Path(p).name,
-        key="pick_full_zip",
-    )
-    up_full = st.file_uploader("O subir un backup completo .zip", type=["zip"], key="up_full_zip")
-    if st.button("♻️ Restaurar backup completo", use_container_width=True, key="restore_full_btn"):
-        try:
-            if up_full is not None:
-                tmp_path = Path(get_backup_dir()) / f"uploaded_full_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.zip"
-                tmp_path.parent.mkdir(parents=True, exist_ok=True)
-                tmp_path.write_bytes(up_full.getvalue())
-                restore_full_from_zip_path(str(tmp_path))
-                st.success("Restaurado (DB + adjuntos). Recargando…")
-                st.rerun()
-            elif pick_full and pick_full != "(ninguno)":
-                restore_full_from_zip_path(pick_full)
-                st.success("Restaurado (DB + adjuntos). Recargando…")
-                st.rerun()
-            else:
-                st.warning("Seleccioná o subí un backup completo .zip.")
-        except Exception as e:
-            st.error(f"No se pudo restaurar el backup completo: {e}")
+    # Expander cerrado: el scan del directorio de backups corre recién cuando
+    # el Super Admin abre el panel de restauración (no en cada rerun).
+    with st.expander("Restaurar backup completo (ZIP) — solo Super Admin", expanded=False):
+        fulls = _cached_list_full_backups()
+        pick_full = st.selectbox(
+            "Backups completos locales (ZIP)",
+            options=["(ninguno)"] + fulls,
+            format_func=lambda p: p if p=="(ninguno)" else Path(p).name,
+            key="pick_full_zip",
+        )
+        up_full = st.file_uploader("O subir un backup completo .zip", type=["zip"], key="up_full_zip")
+        if st.button("♻️ Restaurar backup completo", use_container_width=True, key="restore_full_btn"):
+            try:
+                if up_full is not None:
+                    tmp_path = Path(get_backup_dir()) / f"uploaded_full_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.zip"
+                    tmp_path.parent.mkdir(parents=True, exist_ok=True)
+                    # Volcado en chunks de 1 MB: no materializa el ZIP entero en RAM
+                    with open(tmp_path, "wb") as f:
+                        shutil.copyfileobj(up_full, f, length=1024 * 1024)
+                    restore_full_from_zip_path(str(tmp_path))
+                    _invalidate_cached_conns()
+                    st.success("Restaurado (DB + adjuntos). Recargando…")
+                    st.rerun()
+                elif pick_full and pick_full != "(ninguno)":
+                    restore_full_from_zip_path(pick_full)
+                    _invalidate_cached_conns()
+                    st.success("Restaurado (DB + adjuntos). Recargando…")
+                    st.rerun()
+                else:
+                    st.warning("Seleccioná o subí un backup completo .zip.")
+            except Exception as e:
+                st.error(f"No se pudo restaurar el backup completo: {e}")
 
     st.divider()
     if st.button("Crear backup ahora"):
@@ -464,42 +702,51 @@ def _backup_download_ui():
     b = _normalize_backup_obj(st.session_state.get("_last_backup"))
     st.session_state["_last_backup"] = b
     if b and b.get("ok"):
-        st.download_button(
-            "Descargar último backup (.db)",
-            data=b["bytes"],
-            file_name=b.get("filename","cpf_backup.db"),
-            mime="application/octet-stream",
-            use_container_width=True,
-        )
+        try:
+            data_db = Path(b["path"]).read_bytes()
+        except Exception as e:
+            st.error(f"No pude leer el backup: {e}")
+        else:
+            st.download_button(
+                "Descargar último backup (.db)",
+                data=data_db,
+                file_name=b.get("filename","cpf_backup.db"),
+                mime="application/octet-stream",
+                use_container_width=True,
+            )
     else:
         st.info("Todavía no hay un backup generado en esta sesión.")
 
     st.divider()
-    st.subheader("Restaurar (solo Super Admin)")
-    backups = list_backups()
-    pick = st.selectbox("Backups locales", options=["(ninguno)"] + backups, format_func=lambda p: p if p=="(ninguno)" else Path(p).name)
-    up = st.file_uploader("O subir un backup .db", type=["db"])
-    if st.button("♻️ Restaurar ahora", use_container_width=True):
-        try:
-            if up is not None:
-                tmp_path = Path(get_backup_dir()) / f"uploaded_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.db"
-                tmp_path.parent.mkdir(parents=True, exist_ok=True)
-                tmp_path.write_bytes(up.getvalue())
-                restore_db_from_path(str(tmp_path))
-                st.success("Restaurado. Recargando…")
-                st.rerun()
-            elif pick and pick != "(ninguno)":
-                restore_db_from_path(pick)
-                st.success("Restaurado. Recargando…")
-                st.rerun()
-            else:
-                st.warning("Seleccioná o subí un backup.")
-        except Exception as e:
-            st.error(f"No se pudo restaurar: {e}")
+    with st.expander("Restaurar (solo Super Admin)", expanded=False):
+        backups = _cached_list_backups()
+        pick = st.selectbox("Backups locales", options=["(ninguno)"] + backups, format_func=lambda p: p if p=="(ninguno)" else Path(p).name)
+        up = st.file_uploader("O subir un backup .db", type=["db"])
+        if st.button("♻️ Restaurar ahora", use_container_width=True):
+            try:
+                if up is not None:
+                    tmp_path = Path(get_backup_dir()) / f"uploaded_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.db"
+                    tmp_path.parent.mkdir(parents=True, exist_ok=True)
+                    with open(tmp_path, "wb") as f:
+                        shutil.copyfileobj(up, f, length=1024 * 1024)
+                    restore_db_from_path(str(tmp_path))
+                    _invalidate_cached_conns()
+                    st.success("Restaurado. Recargando…")
+                    st.rerun()
+                elif pick and pick != "(ninguno)":
+                    restore_db_from_path(pick)
+                    _invalidate_cached_conns()
+                    st.success("Restaurado. Recargando…")
+                    st.rerun()
+                else:
+                    st.warning("Seleccioná o subí un backup.")
+            except Exception as e:
+                st.error(f"No se pudo restaurar: {e}")
 
 
 def _logout():
     st.session_state.pop("user", None)
+    st.session_state.pop("_role_cache", None)
     st.rerun()
 
 
@@ -514,7 +761,7 @@ def _assistant_sidebar(role: str):
             q = (st.session_state.get("assistant_q") or "").strip()
             if not q:
                 return
-            out = assistant_answer(q, role=role)
+            out = _assistant_answer_cached(q, role)
             ans = out.get("answer", "")
             st.session_state["assistant_history"].append({"role": "user", "content": q})
             st.session_state["assistant_history"].append({"role": "assistant", "content": ans})
@@ -558,27 +805,66 @@ def _login_ui():
 
 
 
-def _chamber_id_from_name(chambers, chamber_name):
+@st.cache_data(ttl=60, show_spinner=False)
+def _cached_chambers():
+    """Cámaras para los combos de registro/recuperación.
+
+    Cambian muy rara vez y el form se re-ejecuta con cada tecleo: con el
+    cache evitamos un round-trip a la DB por rerun (TTL corto por si el
+    Super Admin agrega una).
+    """
+    chambers = svc.list_chambers()
+    chamber_names = tuple(c["name"] for c in chambers)
+    name_to_id = {c["name"]: c["id"] for c in chambers}
+    return chambers, chamber_names, name_to_id
+
+
+_CHAMBER_PLACEHOLDERS = frozenset({
+    '(Sin cámara)', 'Sin cámara',
+    '-- Seleccioná --', '-- Seleccione --', '-- Seleccionar --',
+})
+
+
+def _chamber_id_from_name(name_to_id, chamber_name):
     """Devuelve el id de la cámara a partir del nombre seleccionado.
     Si el usuario elige un placeholder / '(Sin cámara)' o no hay match, devuelve None.
     """
     if not chamber_name:
         return None
     ch = chamber_name.strip()
-    if ch in ['(Sin cámara)', 'Sin cámara', '-- Seleccioná --', '-- Seleccione --', '-- Seleccionar --']:
+    if ch in _CHAMBER_PLACEHOLDERS:
         return None
-    for c in chambers or []:
-        if c.get('name') == chamber_name:
-            return c.get('id')
-    return None
+    return (name_to_id or {}).get(chamber_name)
+
+# Resaltado rojo de los campos de identidad en la recuperación de contraseña
+_PW_RESET_CSS = """
+<style>
+/* Resaltado rojo: los campos que usamos para validar identidad */
+input[aria-label="Nombre y Apellido"],
+input[aria-label="Empresa"],
+input[aria-label="Teléfono"] {
+    border: 2px solid #d03030 !important;
+    border-radius: 8px !important;
+    box-shadow: 0 0 0 2px rgba(208, 48, 48, 0.10) !important;
+}
+/* Selectbox (Cámara) */
+div[data-testid="stSelectbox"] div[data-baseweb="select"] > div {
+    border: 2px solid #d03030 !important;
+    border-radius: 8px !important;
+    box-shadow: 0 0 0 2px rgba(208, 48, 48, 0.10) !important;
+}
+</style>
+"""
+
 
 def _register_ui():
     # Panel de registro / recuperación de contraseña (sidebar)
-    chambers = svc.list_chambers()
-    chamber_names = [c["name"] for c in chambers]
+    chambers, chamber_names, name_to_id = _cached_chambers()
 
-    # Estado de recuperación
-    stage = st.session_state.get("pw_reset_stage", "none")  # none | identify | verify
+    # Estado de recuperación: todo bajo UNA clave namespaced ("pw_reset")
+    # para crearlo/limpiarlo de un solo golpe en vez de 3 pops sueltos.
+    pwr = st.session_state.setdefault("pw_reset", {})
+    stage = pwr.get("stage", "none")  # none | identify | verify
 
     if stage == "none":
         # --- Registro normal ---
@@ -595,10 +881,10 @@ def _register_ui():
             if chamber_names:
                 chamber_name = st.selectbox(
                     "Cámara o institución",
-                    options=["-- Seleccioná --"] + chamber_names,
+                    options=["-- Seleccioná --", *chamber_names],
                     key="reg_chamber",
                 )
-                chamber_id = _chamber_id_from_name(chambers, chamber_name)
+                chamber_id = _chamber_id_from_name(name_to_id, chamber_name)
             else:
                 st.warning("Aún no hay cámaras/instituciones cargadas. Contactá al administrador para poder registrarte.")
                 chamber_id = None
@@ -634,10 +920,8 @@ def _register_ui():
         # Botón fuera del form (Streamlit no permite 2 submit buttons con acciones distintas)
 
         if st.button("Olvidé mi contraseña"):
-            st.session_state["pw_reset_stage"] = "identify"
-            # Limpiar restos
-            st.session_state.pop("pw_reset_ident", None)
-            st.session_state.pop("pw_reset_notice", None)
+            # Arranca limpio: sin restos de intentos anteriores
+            st.session_state["pw_reset"] = {"stage": "identify"}
             st.rerun()
 
         return
@@ -653,36 +937,16 @@ def _register_ui():
     )
 
     if st.button("Cancelar", key="pw_reset_cancel_top"):
-        st.session_state["pw_reset_stage"] = "none"
-        st.session_state.pop("pw_reset_ident", None)
-        st.session_state.pop("pw_reset_notice", None)
+        st.session_state.pop("pw_reset", None)
         st.rerun()
 
-    # CSS para resaltar los 4 campos de identificación
+    # CSS para resaltar los 4 campos de identificación. Constante de módulo:
+    # no se re-formatea por rerun. (Sí se re-emite mientras dura la etapa:
+    # Streamlit descarta los elementos que no se re-ejecutan en el rerun.)
     if stage == "identify":
-        st.markdown(
-            """
-            <style>
-            /* Resaltado rojo: los campos que usamos para validar identidad */
-            input[aria-label="Nombre y Apellido"],
-            input[aria-label="Empresa"],
-            input[aria-label="Teléfono"] {
-                border: 2px solid #d03030 !important;
-                border-radius: 8px !important;
-                box-shadow: 0 0 0 2px rgba(208, 48, 48, 0.10) !important;
-            }
-            /* Selectbox (Cámara) */
-            div[data-testid="stSelectbox"] div[data-baseweb="select"] > div {
-                border: 2px solid #d03030 !important;
-                border-radius: 8px !important;
-                box-shadow: 0 0 0 2px rgba(208, 48, 48, 0.10) !important;
-            }
-            </style>
-            """,
-            unsafe_allow_html=True,
-        )
+        st.markdown(_PW_RESET_CSS, unsafe_allow_html=True)
 
-    notice = st.session_state.get("pw_reset_notice")
+    notice = pwr.get("notice")
     if notice:
         st.info(notice)
 
@@ -695,15 +959,15 @@ def _register_ui():
             name = st.text_input("Nombre y Apellido", key="pw_reset_name")
             company = st.text_input("Empresa", key="pw_reset_company")
             phone = st.text_input("Teléfono", key="pw_reset_phone")
-            ch = st.selectbox("Cámara o institución", options=["-- Seleccioná --"] + chamber_names, key="pw_reset_ch")
+            ch = st.selectbox("Cámara o institución", options=["-- Seleccioná --", *chamber_names], key="pw_reset_ch")
 
             ok = st.form_submit_button("Enviar clave provisoria")
 
             if ok:
-                chamber_id = _chamber_id_from_name(chambers, ch)
+                chamber_id = _chamber_id_from_name(name_to_id, ch)
 
                 # Guardar identidad para el paso siguiente
-                st.session_state["pw_reset_ident"] = {
+                ident = pwr["ident"] = {
                     "name": (name or "").strip(),
                     "company": (company or "").strip(),
                     "phone": (phone or "").strip(),
@@ -711,7 +975,7 @@ def _register_ui():
                 }
 
                 # Validación mínima (evita consultas vacías)
-                if (not st.session_state["pw_reset_ident"]["name"]) or (not st.session_state["pw_reset_ident"]["company"]) or (not st.session_state["pw_reset_ident"]["phone"]) or (st.session_state["pw_reset_ident"]["chamber_id"] is None):
+                if (not ident["name"]) or (not ident["company"]) or (not ident["phone"]) or (ident["chamber_id"] is None):
                     st.warning("Completá **Nombre y Apellido**, **Empresa**, **Teléfono** y seleccioná tu **Cámara o institución**.")
                 else:
                     # No pedimos email: el envío se hace al correo registrado
@@ -719,10 +983,10 @@ def _register_ui():
                         from auth import request_password_reset  # import local para evitar ciclos
 
                         request_password_reset(
-                            full_name=st.session_state["pw_reset_ident"]["name"],
-                            company=st.session_state["pw_reset_ident"]["company"],
-                            phone=st.session_state["pw_reset_ident"]["phone"],
-                            chamber_id=st.session_state["pw_reset_ident"]["chamber_id"],
+                            full_name=ident["name"],
+                            company=ident["company"],
+                            phone=ident["phone"],
+                            chamber_id=ident["chamber_id"],
                             ttl_minutes=20,
                             min_interval_seconds=90,
                         )
@@ -733,15 +997,15 @@ def _register_ui():
 
                     from_addr2 = (os.getenv("CPF_SMTP_FROM") or os.getenv("SMTP_FROM") or "").strip()
                     sender2 = f"desde **{from_addr2}**" if from_addr2 else "desde la casilla de notificaciones del sistema"
-                    st.session_state["pw_reset_notice"] = (
+                    pwr["notice"] = (
                         "Si los datos coinciden con un usuario registrado, enviamos una **clave provisoria** "
                         f"{sender2} al correo que quedó guardado en el sistema. Revisá también **Spam**."
                     )
-                    st.session_state["pw_reset_stage"] = "verify"
+                    pwr["stage"] = "verify"
                     st.rerun()
 
     if stage == "verify":
-        ident = st.session_state.get("pw_reset_ident") or {}
+        ident = pwr.get("ident") or {}
 
         with st.form("pw_reset_verify_form"):
             code = st.text_input("Clave provisoria (recibida por email)", key="pw_reset_code")
@@ -783,9 +1047,7 @@ def _register_ui():
 
                     if res.get("ok"):
                         st.success("✅ Contraseña actualizada. Ya podés ingresar.")
-                        st.session_state["pw_reset_stage"] = "none"
-                        st.session_state.pop("pw_reset_ident", None)
-                        st.session_state.pop("pw_reset_notice", None)
+                        st.session_state.pop("pw_reset", None)
                         # Limpiar inputs
                         for k in ["pw_reset_code", "pw_reset_new_pw", "pw_reset_new_pw2", "pw_reset_name", "pw_reset_company", "pw_reset_phone", "pw_reset_ch"]:
                             st.session_state.pop(k, None)
@@ -808,8 +1070,7 @@ def _register_ui():
 def _admin_bootstrap_ui():
     st.info("No existe usuario Admin. Creá el Admin inicial para habilitar el sistema.")
 
-    chambers = svc.list_chambers()
-    chamber_names = [c["name"] for c in chambers]
+    chambers, chamber_names, name_to_id = _cached_chambers()
 
     with st.form("bootstrap_admin"):
         email = st.text_input("Correo electrónico (Administrador)")
@@ -821,12 +1082,7 @@ def _admin_bootstrap_ui():
         ok = st.form_submit_button("Crear administrador")
 
         if ok:
-            chamber_id = None
-            if ch != "(Sin cámara)":
-                for c in chambers:
-                    if c["name"] == ch:
-                        chamber_id = c["id"]
-                        break
+            chamber_id = None if ch == "(Sin cámara)" else name_to_id.get(ch)
             try:
                 user_id = create_user(
                     email=email,
@@ -855,6 +1111,151 @@ def _admin_bootstrap_ui():
 
 
 
+@st.cache_resource(show_spinner=False)
+def _read_conn():
+    """Conexión de SOLO lectura compartida entre reruns.
+
+    Abrir un handle SQLite por render (pragmas incluidos) es puro overhead
+    para consultas de lectura; query_only evita usarla por error en writes.
+    """
+    c = db_conn()
+    c.execute("PRAGMA query_only=ON")
+    # Temporales en RAM y mmap del archivo: menos syscalls en páginas calientes
+    c.execute("PRAGMA temp_store=MEMORY")
+    c.execute("PRAGMA mmap_size=268435456")
+    return c
+
+
+def _invalidate_cached_conns():
+    """Cierra y descarta las conexiones cacheadas tras restaurar la DB.
+
+    El restore reemplaza cpf.db en el lugar; seguir sirviendo páginas desde
+    el cache de una conexión abierta sobre el archivo swapeado es un
+    escenario de corrupción documentado por SQLite.
+    """
+    for factory in (_read_conn, _write_conn):
+        try:
+            factory().close()
+        except Exception:
+            pass
+        try:
+            factory.clear()
+        except Exception:
+            pass
+
+
+@st.cache_resource(show_spinner=False)
+def _write_conn():
+    """Conexión de escritura compartida para los updates puntuales de la UI.
+
+    Usar siempre como `with _write_conn() as c:` para que el commit sea
+    automático y la transacción quede corta (WAL admite un solo writer).
+    """
+    return db_conn()
+
+
+@functools.lru_cache(maxsize=1)
+def _detect_kind_col():
+    """Detecta si la columna es 'type' (actual) o 'kind' (legacy), UNA vez.
+
+    El esquema no cambia en runtime: no tiene sentido repetir el PRAGMA en
+    cada refresco de métricas.
+    """
+    try:
+        cols = [r["name"] for r in _read_conn().execute("PRAGMA table_info(requirements)").fetchall()]
+    except Exception:
+        return "type"
+    return "type" if "type" in cols else ("kind" if "kind" in cols else None)
+
+
+# SQL de métricas como constantes: texto idéntico en cada execute() para que
+# el cache de prepared statements de sqlite3 (cached_statements) haga hit.
+_SQL_METRICS_TOTALS = (
+    "SELECT (SELECT COUNT(*) FROM chambers) AS chambers, "
+    "(SELECT COUNT(*) FROM users) AS users"
+)
+_SQL_METRICS_CONTACTS = (
+    "SELECT COALESCE(SUM(status='pending'), 0) AS pending, "
+    "COALESCE(SUM(status='accepted'), 0) AS accepted, "
+    "COALESCE(SUM(status='declined'), 0) AS rejected "
+    "FROM contact_requests"
+)
+
+
+@functools.lru_cache(maxsize=1)
+def _sql_metrics_requirements():
+    """SQL de requerimientos abiertos, armado UNA vez según la columna real."""
+    kind_col = _detect_kind_col()
+    if not kind_col:
+        return "SELECT COUNT(*) AS open_total FROM requirements WHERE status='open'"
+    return (
+        f"SELECT COUNT(*) AS open_total, "
+        f"COALESCE(SUM({kind_col}='offer'), 0) AS open_offers, "
+        f"COALESCE(SUM({kind_col}='need'), 0) AS open_needs "
+        "FROM requirements WHERE status='open'"
+    )
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _public_metrics():
+    """Contadores del panel público, cacheados 60s.
+
+    El panel lo ve todo visitante anónimo y Streamlit re-ejecuta el script
+    por interacción: con el cache la mayoría de los hits salen de RAM.
+    Se invalida explícitamente al publicar o solicitar contacto.
+    Agregados condicionales: cada tabla se escanea UNA vez en lugar de un
+    COUNT por métrica (6 round-trips a SQLite -> 3 por refresco).
+    """
+    c = _read_conn()
+
+    # Compatibilidad de esquema: en DB el campo puede llamarse 'type' (actual) o 'kind' (legacy).
+    row_req = c.execute(_sql_metrics_requirements()).fetchone()
+    keys = row_req.keys()
+    open_offers = row_req["open_offers"] if "open_offers" in keys else 0
+    open_needs = row_req["open_needs"] if "open_needs" in keys else 0
+
+    row_tot = c.execute(_SQL_METRICS_TOTALS).fetchone()
+    row_cr = c.execute(_SQL_METRICS_CONTACTS).fetchone()
+
+    return {
+        "chambers": row_tot["chambers"],
+        "users_total": row_tot["users"],
+        "open_total": row_req["open_total"],
+        "open_offers": open_offers,
+        "open_needs": open_needs,
+        "pending": row_cr["pending"],
+        "accepted": row_cr["accepted"],
+        "rejected": row_cr["rejected"],
+    }
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def _latest_open(limit: int = 10):
+    return svc.search_requirements_summary(status="open", limit=limit)
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def _cached_admin_metrics():
+    """Métricas del Panel logueado, cacheadas 30s (agregados read-mostly)."""
+    return svc.admin_metrics()
+
+
+@st.cache_data(ttl=15, show_spinner=False)
+def _search_cached(q: str, tipo: str, status: str, chamber_id):
+    """Búsqueda del navegador cacheada 15s.
+
+    Repetir los mismos filtros dentro de la ventana (reruns por botones de
+    la misma pantalla) resuelve en RAM en vez de re-ejecutar los LIKE.
+    """
+    return svc.search_requirements(q=q, type_=tipo, status=status, chamber_id=chamber_id)
+
+
+@st.cache_data(ttl=600, max_entries=200, show_spinner=False)
+def _att_bytes(att_id: int):
+    """Bytes de un adjunto, cacheados (los archivos publicados no cambian)."""
+    return svc.read_attachment_bytes(int(att_id))
+
+
 def _public_panel_home():
     """Pantalla pública (sin login): panel de situación + texto motivacional."""
     _fixed_manual_and_exit_controls()
@@ -864,52 +1265,41 @@ def _public_panel_home():
         "ingresá o registrate desde el menú lateral."
     )
 
-    # Métricas generales (sin datos personales)
-    c = db_conn()
-    chambers = c.execute("SELECT COUNT(*) AS n FROM chambers").fetchone()["n"]
-    open_total = c.execute("SELECT COUNT(*) AS n FROM requirements WHERE status='open'").fetchone()["n"]
-
-    # Compatibilidad de esquema: en DB el campo puede llamarse 'type' (actual) o 'kind' (legacy).
-    req_cols = [r["name"] for r in c.execute("PRAGMA table_info(requirements)").fetchall()]
-    kind_col = "type" if "type" in req_cols else ("kind" if "kind" in req_cols else None)
-    if kind_col:
-        open_offers = c.execute(
-            f"SELECT COUNT(*) AS n FROM requirements WHERE status='open' AND {kind_col}='offer'"
-        ).fetchone()["n"]
-        open_needs = c.execute(
-            f"SELECT COUNT(*) AS n FROM requirements WHERE status='open' AND {kind_col}='need'"
-        ).fetchone()["n"]
-    else:
-        open_offers = 0
-        open_needs = 0
-    users_total = c.execute("SELECT COUNT(*) AS n FROM users").fetchone()["n"]
-
-    pending = c.execute("SELECT COUNT(*) AS n FROM contact_requests WHERE status='pending'").fetchone()["n"]
-    accepted = c.execute("SELECT COUNT(*) AS n FROM contact_requests WHERE status='accepted'").fetchone()["n"]
-    rejected = c.execute("SELECT COUNT(*) AS n FROM contact_requests WHERE status='declined'").fetchone()["n"]
+    # Métricas generales (sin datos personales), detrás de un toggle: el
+    # visitante anónimo que solo viene a mirar publicaciones no dispara las
+    # consultas de agregados. (Un expander no alcanza: Streamlit ejecuta
+    # igual el código de los expanders colapsados.)
+    if st.checkbox("📊 Ver estadísticas generales", key="show_metrics"):
+        m = _public_metrics()
+        chambers = m["chambers"]
+        users_total = m["users_total"]
+        open_total = m["open_total"]
+        pending = m["pending"]
+        accepted = m["accepted"]
+        rejected = m["rejected"]
 
-    r1 = st.columns(2)
-    r1[0].metric("Publicaciones activas", int(open_total))
-    r1[1].metric("Usuarios registrados", int(users_total))
+        r1 = st.columns(2)
+        r1[0].metric("Publicaciones activas", int(open_total))
+        r1[1].metric("Usuarios registrados", int(users_total))
 
-    r2 = st.columns(2)
-    r2[0].metric("Solicitudes pendientes", int(pending))
-    r2[1].metric("Contactos aprobados", int(accepted))
+        r2 = st.columns(2)
+        r2[0].metric("Solicitudes pendientes", int(pending))
+        r2[1].metric("Contactos aprobados", int(accepted))
 
-    r3 = st.columns(2)
-    r3[0].metric("Cámaras", int(chambers))
-    r3[1].metric("Solicitudes rechazadas", int(rejected))
+        r3 = st.columns(2)
+        r3[0].metric("Cámaras", int(chambers))
+        r3[1].metric("Solicitudes rechazadas", int(rejected))
 
     st.markdown("---")
     st.subheader("Últimas publicaciones activas")
     st.caption("En esta vista no se muestran emails ni teléfonos. Para solicitar contacto, ingresá/registrate.")
 
-    latest = svc.search_requirements(status="open", limit=10)
+    latest = _latest_open(10)
     if not latest:
         st.info("Todavía no hay publicaciones activas.")
     else:
         for r in latest:
-            kind = "OFERTA" if (r.get("type") == "offer" or r.get("kind") == "offer") else "NECESIDAD"
+            kind = _KIND_LABEL.get(r.get("type") or r.get("kind"), "NECESIDAD")
             company = r.get("company") or "(Sin empresa)"
             loc = r.get("location") or "(Sin ubicación)"
             chamber = r.get("chamber_name") or "(Sin cámara)"
@@ -983,11 +1373,17 @@ def _assistant_approval_panel(u: dict):
     st.subheader("Validar nuevos usuarios")
     st.caption("Solo podés aprobar/rechazar usuarios **de tu cámara**. Los asistentes se validan únicamente por Super Admin.")
 
-    pending = svc.list_pending_users_by_chamber(int(chamber_id), limit=300)
+    # Paginado: cada pendiente renderiza ~6 widgets, así que traer 300 de una
+    # arma cientos de objetos por rerun. Se pide de a PAGE filas desde SQL.
+    PAGE = 25
+    total_pending = int(m.get("pending_users", 0))
+    max_page = max(0, (total_pending - 1) // PAGE)
+    page = min(int(st.session_state.get("as_page", 0)), max_page)
+    pending = svc.list_pending_users_by_chamber(int(chamber_id), limit=PAGE, offset=page * PAGE)
     if not pending:
         st.success("No hay usuarios pendientes en tu cámara.")
     else:
-        st.caption(f"Pendientes: {len(pending)}")
+        st.caption(f"Pendientes: {total_pending} · página {page + 1} de {max_page + 1}")
         for pu in pending:
             puid = int(pu["id"])
             head = f"#{puid} · {pu.get('email','(sin email)')}"
@@ -1054,21 +1450,25 @@ def _assistant_approval_panel(u: dict):
                         except Exception as e:
                             st.error(str(e))
 
+        if max_page > 0:
+            pc1, pc2 = st.columns(2)
+            with pc1:
+                if st.button("◀ Anterior", key="as_page_prev", disabled=page <= 0):
+                    st.session_state["as_page"] = page - 1
+                    st.rerun()
+            with pc2:
+                if st.button("Siguiente ▶", key="as_page_next", disabled=page >= max_page):
+                    st.session_state["as_page"] = page + 1
+                    st.rerun()
+
     st.divider()
     st.subheader("Usuarios aprobados de tu cámara")
     q = st.text_input("Buscar (email, nombre o empresa)", key="as_q_ok")
-    ok_users = svc.list_active_approved_users_by_chamber(int(chamber_id), limit=1000)
-    if q:
-        qn = q.strip().lower()
-        ok_users = [
-            r
-            for r in ok_users
-            if qn in str(r.get("email") or "").lower()
-            or qn in str(r.get("name") or "").lower()
-            or qn in str(r.get("company") or "").lower()
-        ]
+    # El filtro corre en SQL: no se traen 1000 filas para descartarlas acá
+    ok_users = svc.search_approved_users_by_chamber(int(chamber_id), q, limit=1000)
     st.caption(f"Total: {len(ok_users)}")
     if ok_users:
+        _ensure_pd()
         df = pd.DataFrame(ok_users)
         keep = ["id", "email", "name", "company", "phone", "approved_at", "created_at"]
         df = df[[c for c in keep if c in df.columns]].copy()
@@ -1078,11 +1478,156 @@ def _assistant_approval_panel(u: dict):
 
     st.info("📱 **Celular:** para registrarte o ingresar, tocá el menú **☰** (arriba a la izquierda) y abrí la sección **Sesión**.\n🖥️ **PC:** la sección **Sesión** está en la barra lateral izquierda.")
 
+
+# Fragments de administración: los botones de acá reruns SOLO su bloque
+# (scope="fragment"), sin re-ejecutar main() completo (bandejas, búsqueda,
+# métricas, etc.) por cada click de Suspender/Anular/Aprobar.
+@st.fragment
+def _admin_users_fragment(u: dict):
+    st.subheader("Gestión de Administradores")
+    st.caption(
+        "El **Super Admin** puede: **Suspender** (reversible) o **Anular** (desactiva) a los usuarios con rol **admin**."
+    )
+
+    admins = svc.list_admin_users(limit=500)
+    if not admins:
+        st.info("No hay administradores dados de alta.")
+        return
+
+    # Set de SA en minúsculas armado UNA vez (no por fila)
+    sa_lower = {e.lower() for e in _cached_super_admin_emails()}
+    for a in admins:
+        a["estado"] = "ANULADO" if int(a.get("is_active", 0)) == 0 else ("SUSPENDIDO" if int(a.get("is_suspended", 0)) == 1 else "ACTIVO")
+
+    # Grilla compacta para recorrer la lista (una sola st.dataframe) y
+    # acciones SOLO para la fila elegida: antes cada admin instanciaba un
+    # expander + columnas + botones, O(A) widgets por rerun.
+    _ensure_pd()
+    df_a = pd.DataFrame(admins)[["id", "email", "name", "company", "phone", "estado"]]
+    st.dataframe(df_a, use_container_width=True, hide_index=True)
+
+    by_id = {int(a["id"]): a for a in admins}
+    pick_id = st.selectbox(
+        "Actuar sobre",
+        list(by_id),
+        format_func=lambda i: f"#{i} · {by_id[i].get('email')} · {by_id[i].get('name') or '(Sin nombre)'}",
+        key="adm_pick",
+    )
+    a = by_id[int(pick_id)]
+
+    # Evitar acciones sobre el propio Super Admin si también figura como admin
+    if str(a.get("email", "")).strip().lower() in sa_lower:
+        st.info("Este usuario tiene permisos de **Super Admin**. Para suspender/anular, primero quitá el permiso de Super Admin.")
+        return
+
+    c1, c2 = st.columns(2)
+    with c1:
+        if int(a.get("is_active", 0)) == 1:
+            if int(a.get("is_suspended", 0)) == 0:
+                if st.button("⏸️ Suspender", key=f"sus_{a['id']}", use_container_width=True):
+                    svc.set_user_suspended(int(a["id"]), True, actor_user_id=int(u["id"]))
+                    st.warning("Administrador suspendido.")
+                    st.rerun(scope="fragment")
+            else:
+                if st.button("▶️ Reactivar", key=f"unsus_{a['id']}", use_container_width=True):
+                    svc.set_user_suspended(int(a["id"]), False, actor_user_id=int(u["id"]))
+                    st.success("Administrador reactivado.")
+                    st.rerun(scope="fragment")
+        else:
+            st.caption("Cuenta desactivada.")
+
+    with c2:
+        if int(a.get("is_active", 0)) == 1:
+            if st.button("🗑️ Anular (desactivar)", key=f"anular_{a['id']}", use_container_width=True):
+                svc.deactivate_user(int(a["id"]), actor_user_id=int(u["id"]))
+                st.error("Administrador anulado (cuenta desactivada).")
+                st.rerun(scope="fragment")
+
+
+@st.fragment
+def _moderation_fragment():
+    st.subheader("Moderación rápida")
+    st.caption("Listado práctico para moderar publicaciones. La acción **Anular** las saca de circulación.")
+    # Form = sin rerun (ni query) por tecla: se busca recién al enviar,
+    # igual que el form de búsqueda del tab Navegar
+    with st.form("sa_mod_form"):
+        qmod = st.text_input("Buscar (título/desc/empresa/tags)", key="sa_mod_q")
+        status_mod = st.selectbox(
+            "Estado",
+            ["(Todos)", "open", "closed", "annulled"],
+            key="sa_mod_status",
+            format_func=lambda x: _STATUS_LABELS.get(x, x),
+        )
+        st.form_submit_button("🔍 Buscar")
+    status_param = "" if status_mod == "(Todos)" else status_mod
+
+    # Paginación en SQL: solo la página visible viaja desde la DB y se
+    # renderiza (antes: hasta 50 expanders fijos, sin forma de ver el resto)
+    PAGE = 50
+    total_mod = svc.count_requirements(q=qmod, type_="(Todos)", status=status_param, chamber_id=None)
+    pages = max(1, -(-total_mod // PAGE))
+    page = int(st.number_input("Página", min_value=1, max_value=pages, value=1, key="sa_mod_page"))
+    reqs_mod = svc.search_requirements(
+        q=qmod, type_="(Todos)", status=status_param, chamber_id=None,
+        limit=PAGE, offset=(page - 1) * PAGE,
+    )
+
+    st.caption(f"Mostrando {len(reqs_mod)} de {total_mod} requerimiento(s).")
+    for r in reqs_mod:
+        with st.expander(f"#{r['id']} · {_KIND_LABEL.get(r.get('type'), 'OFERTA')} · {r['title']}"):
+            st.write(f"**Empresa:** {r.get('company') or '-'}")
+            st.write(f"**Cámara:** {r.get('chamber_name') or '(Sin cámara)'}")
+            st.write(f"**Estado:** {_STATUS_LABELS.get(r.get('status'), r.get('status'))}")
+            st.write(r.get("description") or "")
+            if r.get("status") != "annulled":
+                if st.button("⚠️ Anular requerimiento", key=f"sa_annul_{r['id']}", use_container_width=True):
+                    svc.update_requirement(r["id"], status="annulled")
+                    _latest_open.clear()
+                    _search_cached.clear()
+                    st.warning("Requerimiento anulado.")
+                    st.rerun(scope="fragment")
+            else:
+                st.info("Este requerimiento ya está **ANULADO**.")
+
+
+@st.fragment
+def _validate_users_fragment(u: dict):
+    st.header("Validar usuarios (solo Super Admin)")
+    total_pend = svc.count_pending_users()
+    if not total_pend:
+        st.info("No hay usuarios pendientes de validación.")
+        return
+    PAGE = 50
+    pages = max(1, -(-total_pend // PAGE))
+    page = int(st.number_input("Página", min_value=1, max_value=pages, value=1, key="val_users_page"))
+    pending = svc.list_pending_users(limit=PAGE, offset=(page - 1) * PAGE)
+    st.caption(f"Pendientes: {total_pend}")
+    for pu in pending:
+        st.markdown("---")
+        st.markdown(f"**{pu.get('name','(Sin nombre)')}** — {pu.get('company','(Sin empresa)')}")
+        st.write(f"Email: {pu.get('email')}")
+        if pu.get("phone"):
+            st.write(f"Tel: {pu.get('phone')}")
+        st.caption(f"Registrado: {pu.get('created_at')}")
+        c1, c2 = st.columns(2)
+        with c1:
+            if st.button("✅ Aprobar", key=f"approve_{pu['id']}", use_container_width=True):
+                svc.approve_user(int(pu["id"]), approved_by_user_id=int(u["id"]))
+                st.success("Usuario aprobado.")
+                st.rerun(scope="fragment")
+        with c2:
+            if st.button("⛔ Rechazar", key=f"reject_{pu['id']}", use_container_width=True):
+                svc.reject_user(int(pu["id"]), rejected_by_user_id=int(u["id"]))
+                st.warning("Usuario rechazado (cuenta desactivada).")
+                st.rerun(scope="fragment")
+
+
 def main():
     st.set_page_config(page_title="CPF – Sistema de Requerimientos", layout="wide")
     # Logo CPF: se renderiza dentro de la barra lateral (Sesión)
 
     u = None
+    is_sa = False
     has_admin = any_admin_exists()
 
     with st.sidebar:
@@ -1094,6 +1639,8 @@ def main():
             _assistant_sidebar(role="anon")
         else:
             u = _get_user()
+            # Se calcula UNA vez por rerun y se reutiliza en sidebar y tabs.
+            is_sa = bool(u and is_super_admin(_uget(u, "email", "")))
             if not u:
                 c1, c2 = st.columns(2)
                 with c1:
@@ -1109,7 +1656,7 @@ def main():
                 # Backup automático al ingresar (solo admin)
                 # _maybe_auto_backup("login")  # (deshabilitado: backup sólo al cerrar sesión)
 
-                if is_super_admin(_uget(u, 'email', "")):
+                if is_sa:
                     st.markdown("---")
                     st.subheader("Resguardo (solo Super Admin)")
                     _backup_download_ui()
@@ -1129,7 +1676,6 @@ def main():
                 # Si querés ocultarlo para Super Admin, setear CPF_DISK_HIDE_SUPERADMIN=1 en Render.
                 try:
                     if u.get("role") == "admin":
-                        is_sa = is_super_admin(_uget(u, "email", ""))
                         hide_sa = os.getenv("CPF_DISK_HIDE_SUPERADMIN", "0") == "1"
                         if (not is_sa) or (not hide_sa):
                             st.markdown("---")
@@ -1174,7 +1720,6 @@ def main():
 
 
     role = u["role"] if u else "anon"
-    is_sa = bool(u and is_super_admin(_uget(u, 'email', '')))
     tab_names = ["Navegar", "Publicar", "Bandeja", "Panel", "Interesados", "Asistente IA"]
     if is_sa:
         tab_names.append("Dar de alta")
@@ -1185,45 +1730,64 @@ def main():
     with t[0]:
         st.header("Requisitos del navegador")
 
-        chambers = svc.list_chambers()
-        chamber_options = ["(Todas)"] + [c["name"] for c in chambers]
-        chamber_sel = st.selectbox("Cámara", chamber_options)
-        chamber_id = None
-        if chamber_sel != "(Todas)":
-            for c in chambers:
-                if c["name"] == chamber_sel:
-                    chamber_id = c["id"]
-                    break
-
-        q = st.text_input("Buscar (producto/palabra clave/empresa/persona/tags)")
-        tipo = st.selectbox("Tipo", ["(Todos)", "need", "offer"],
-                            format_func=lambda x: {"(Todos)": "(Todos)", "need": "Necesidad", "offer": "Oferta"}.get(x, x))
-        is_sa = bool(u and is_super_admin(_uget(u, 'email', '')))
-        status_options = ["open", "closed"] if not is_sa else ["(Todos)", "open", "closed", "annulled"]
-        status = st.selectbox(
-            "Estado",
-            status_options,
-            format_func=lambda x: {"(Todos)": "(Todos)", "open": "abierto", "closed": "cerrado", "annulled": "anulado"}.get(x, x),
-        )
+        chambers, chamber_names, name_to_id = _cached_chambers()
+        # Form: los filtros recién disparan la búsqueda al apretar "Buscar",
+        # no en cada tecla/selección (cada evento re-ejecuta todo el script).
+        with st.form("nav_search"):
+            chamber_sel = st.selectbox("Cámara", ["(Todas)", *chamber_names])
+            q = st.text_input("Buscar (producto/palabra clave/empresa/persona/tags)")
+            tipo = st.selectbox("Tipo", ["(Todos)", "need", "offer"],
+                                format_func=lambda x: {"(Todos)": "(Todos)", "need": "Necesidad", "offer": "Oferta"}.get(x, x))
+            status_options = ["open", "closed"] if not is_sa else ["(Todos)", "open", "closed", "annulled"]
+            status = st.selectbox(
+                "Estado",
+                status_options,
+                format_func=lambda x: _STATUS_LABELS.get(x, x),
+            )
+            st.form_submit_button("🔍 Buscar")
+
+        chamber_id = None if chamber_sel == "(Todas)" else name_to_id.get(chamber_sel)
         status_param = "" if status == "(Todos)" else status
 
-        reqs = svc.search_requirements(q=q, type_=tipo, status=status_param, chamber_id=chamber_id)
+        reqs = _search_cached(q, tipo, status_param, chamber_id)
 
         
         st.subheader(f"Resultados ({len(reqs)})")
-        for r in reqs:
-            status_r = (r.get("status") or "open").lower()
-            is_ann = status_r == "annulled"
-            kind = "NECESIDAD" if r.get("type") == "need" else "OFERTA"
-            badge = " 🟥 ANULADO" if is_ann else ""
-            color = "red" if is_ann else "black"
-
-            st.markdown(
-                f"<div style='color:{color}; font-weight:600'>#{r['id']} · {kind} · {r['title']}{badge}</div>",
-                unsafe_allow_html=True,
+        if not reqs:
+            st.info("Sin resultados para los filtros elegidos.")
+        else:
+            # Una sola grilla virtualizada en lugar de un st.markdown + un
+            # expander POR fila (N mensajes de render -> 1). El detalle se
+            # dibuja únicamente para la fila seleccionada.
+            _ensure_pd()
+            df_view = pd.DataFrame(
+                [
+                    {
+                        "ID": r["id"],
+                        "Tipo": _KIND_LABEL.get(r.get("type"), "OFERTA"),
+                        "Título": r.get("title") or "(Sin título)",
+                        "Empresa": r.get("company") or "(Sin empresa)",
+                        "Cámara": r.get("chamber_name") or "(Sin cámara)",
+                        "Estado": "🟥 ANULADO" if (r.get("status") or "open").lower() == "annulled" else (r.get("status") or "open"),
+                    }
+                    for r in reqs
+                ]
             )
-
-            with st.expander("Ver detalles", expanded=False):
+            event = st.dataframe(
+                df_view,
+                use_container_width=True,
+                hide_index=True,
+                on_select="rerun",
+                selection_mode="single-row",
+                key="nav_results",
+            )
+            sel_rows = list(event.selection.rows) if event is not None else []
+            if not sel_rows:
+                st.caption("Seleccioná una fila para ver el detalle de la publicación.")
+            else:
+                r = reqs[sel_rows[0]]
+                status_r = (r.get("status") or "open").lower()
+                is_ann = status_r == "annulled"
                 if is_ann:
                     st.markdown("<div style='color:red; font-weight:700'>REQUERIMIENTO ANULADO POR MODERACIÓN</div>", unsafe_allow_html=True)
 
@@ -1234,32 +1798,57 @@ def main():
                 st.write(f"**Urgencia:** {r.get('urgency','Media')}")
                 if r.get("tags"):
                     st.write(f"**Tags:** {r['tags']}")
-                cover = svc.get_cover_image_bytes(r["id"])
-                if cover and cover.get("bytes"):
-                    st.image(cover["bytes"], width=320)
+                # Solo los adjuntos de la fila seleccionada (una query, no N);
+                # LIMIT en SQL: se pide uno más que lo mostrado para saber si
+                # hay que avisar que existen más
+                atts = svc.list_attachments(r["id"], limit=MAX_ATTACHMENTS + 1)
+
+                # Portada: primer adjunto imagen (misma regla que
+                # get_cover_image_bytes); los bytes salen del cache.
+                cover_att = next(
+                    (
+                        a for a in atts
+                        if str(a.get("mime") or "").lower().startswith("image/")
+                        or str(a.get("filename") or "").lower().rsplit(".", 1)[-1] in IMAGE_EXTS
+                    ),
+                    None,
+                )
+                if cover_att:
+                    cover_data = _att_bytes(cover_att["id"])
+                    if cover_data:
+                        st.image(cover_data, width=320)
 
                 st.write(r["description"])
 
-                atts = svc.list_attachments(r["id"])
                 if atts:
                     if len(atts) > MAX_ATTACHMENTS:
-                        st.caption(f"Se muestran los primeros {MAX_ATTACHMENTS} adjuntos (hay {len(atts)}).")
+                        st.caption(f"Se muestran los primeros {MAX_ATTACHMENTS} adjuntos (hay más).")
                     st.write("**Adjuntos:**")
                     for a in atts[:MAX_ATTACHMENTS]:
-                        data = svc.read_attachment_bytes(a["id"])
                         size = int(a.get("size") or 0)
                         size_kb = f"{max(1, size // 1024)} KB" if size else "?"
-                        mime = "application/pdf" if str(a.get("filename", "")).lower().endswith(".pdf") else "application/octet-stream"
-                        if data:
-                            st.download_button(
-                                label=f"⬇️ Descargar {a['filename']} ({size_kb})",
-                                data=data,
-                                file_name=a["filename"],
-                                mime=mime,
-                                key=f"dl_att_{a['id']}"
-                            )
-                        else:
-                            st.write(f"- {a['filename']} ({size_kb}) — archivo no disponible")
+                        mime = _EXT_MIME.get(str(a.get("filename", "")).rpartition(".")[2].lower(), "application/octet-stream")
+                        # Dos pasos: los bytes recién se materializan cuando el
+                        # usuario pide la descarga.
+                        ready_key = f"att_ready_{a['id']}"
+                        if st.session_state.get(ready_key):
+                            data = _att_bytes(a["id"])
+                            if data:
+                                st.download_button(
+                                    label=f"⬇️ Descargar {a['filename']} ({size_kb})",
+                                    data=data,
+                                    file_name=a["filename"],
+                                    mime=mime,
+                                    key=f"dl_att_{a['id']}"
+                                )
+                            else:
+                                st.write(f"- {a['filename']} ({size_kb}) — archivo no disponible")
+                        elif st.button(
+                            f"Preparar descarga de {a['filename']} ({size_kb})",
+                            key=f"prep_att_{a['id']}",
+                        ):
+                            st.session_state[ready_key] = True
+                            st.rerun()
 
                 if u and int(u["id"]) != int(r["user_id"]):
                     if status_r != "open":
@@ -1267,31 +1856,14 @@ def main():
                     else:
                         if st.button("Solicitar contacto", key=f"contact_{r['id']}"):
                             svc.create_contact_request(from_user_id=u["id"], to_user_id=r["user_id"], requirement_id=r["id"])
-                            try:
-                                # Notificaciones por mail (si está configurado SMTP)
-                                req = svc.get_requirement(int(r["id"]))
-                                cdb = db_conn()
-                                owner = cdb.execute("SELECT email, name FROM users WHERE id=?", (int(req["user_id"]),)).fetchone()
-                                cdb.close()
-                                mailer.notify_interest_owner(
-                                    owner_email=(owner["email"] if owner else ""),
-                                    owner_name=(owner["name"] if owner else ""),
-                                    kind=(req.get("type") or ""),
-                                    title=(req.get("title") or ""),
-                                    company=(req.get("company") or ""),
-                                )
-                                mailer.notify_interest_sender(
-                                    sender_email=(u.get("email") or ""),
-                                    sender_name=(u.get("name") or ""),
-                                    kind=(req.get("type") or ""),
-                                    title=(req.get("title") or ""),
-                                    company=(req.get("company") or ""),
-                                )
-                            except Exception:
-                                try:
-                                    cdb.close()
-                                except Exception:
-                                    pass
+                            _public_metrics.clear()
+                            # Notificaciones por mail (si está configurado SMTP)
+                            # en segundo plano: el botón responde sin esperar al SMTP
+                            _notify_contact_request_async(
+                                int(r["id"]),
+                                u.get("email") or "",
+                                u.get("name") or "",
+                            )
                             st.success("Solicitud enviada.")
 
     with t[1]:
@@ -1312,8 +1884,8 @@ def main():
             if len(files) > MAX_ATTACHMENTS:
                 st.warning(f"Seleccionaste {len(files)} adjuntos. El máximo permitido es {MAX_ATTACHMENTS}. Eliminá algunos antes de publicar.")
 
-        chambers = svc.list_chambers()
-        chamber_options = ["(Sin cámara)"] + [c["name"] for c in chambers]
+        chambers, chamber_names, name_to_id = _cached_chambers()
+        chamber_options = ["(Sin cámara)", *chamber_names]
 
         with st.form("publish_form"):
             type_ = st.selectbox("Tipo", ["need", "offer"],
@@ -1321,17 +1893,12 @@ def main():
             title = st.text_input("Título")
             desc = st.text_area("Descripción", height=160)
 
-            category = st.selectbox("Categoría (obligatoria)", ["(Sin categoría)"] + CATEGORIES)
+            category = st.selectbox("Categoría (obligatoria)", _CATS_WITH_NONE)
             urgency = st.selectbox("Urgencia", URGENCY, index=1)
             tags = st.text_input("Tags (opcional, separados por coma)")
 
             chamber_sel = st.selectbox("Cámara (opcional)", chamber_options)
-            chamber_id = None
-            if chamber_sel != "(Sin cámara)":
-                for c in chambers:
-                    if c["name"] == chamber_sel:
-                        chamber_id = c["id"]
-                        break
+            chamber_id = None if chamber_sel == "(Sin cámara)" else name_to_id.get(chamber_sel)
 
             location = st.text_input("Ubicación (obligatoria)")
 
@@ -1370,7 +1937,8 @@ def main():
                     final_desc = rev.get("suggested_description", desc).strip()
                     final_category = None if category == "(Sin categoría)" else category
 
-                    req_id = svc.create_requirement(
+                    # Requerimiento + adjuntos en UNA transacción (un solo fsync)
+                    req_id, att_warnings = svc.publish_with_attachments(
                         type_=type_,
                         title=final_title,
                         description=final_desc,
@@ -1381,20 +1949,15 @@ def main():
                         category=final_category,
                         urgency=urgency,
                         tags=tags,
+                        attachments=[(f.name, f.getvalue(), getattr(f, "type", None)) for f in (files or [])],
                     )
+                    for w in att_warnings:
+                        st.warning(f"No se pudo guardar {w}")
 
-                    if files:
-                        for f in files:
-                            try:
-                                svc.save_attachment(
-                                    requirement_id=req_id,
-                                    uploaded_by_user_id=u["id"],
-                                    filename=f.name,
-                                    content=f.getvalue(),
-                                    mime=getattr(f, "type", None),
-                                )
-                            except Exception as e:
-                                st.warning(f"No se pudo guardar {f.name}: {e}")
+                    # La publicación nueva debe verse en el panel público
+                    _public_metrics.clear()
+                    _latest_open.clear()
+                    _search_cached.clear()
 
                     st.success(f"Requerimiento publicado con ID #{req_id}.")
 
@@ -1402,6 +1965,25 @@ def main():
         st.header("Bandeja")
 
         st.subheader("Solicitudes de contacto recibidas")
+
+        # Callbacks: corren ANTES del rerun, así la respuesta ya está
+        # persistida cuando se vuelve a listar la bandeja (sin el doble
+        # rerun del patrón if st.button + st.rerun).
+        def _accept_contact(cr_id: int):
+            svc.respond_contact_request(cr_id, "accepted")
+            _notify_accept_async(int(cr_id))
+            _inbox_grouped_cached.clear()
+            st.session_state["inbox_flash"] = ("success", "Aceptada.")
+
+        def _decline_contact(cr_id: int):
+            svc.respond_contact_request(cr_id, "declined")
+            _inbox_grouped_cached.clear()
+            st.session_state["inbox_flash"] = ("info", "Rechazada.")
+
+        flash = st.session_state.pop("inbox_flash", None)
+        if flash:
+            (st.success if flash[0] == "success" else st.info)(flash[1])
+
         inbox = svc.list_inbox(u["id"], status="pending")
         if not inbox:
             st.write("No tenés solicitudes pendientes.")
@@ -1411,37 +1993,9 @@ def main():
                     st.write(f"**Contacto:** {it['from_name']} · {it['from_email']} · {it.get('from_phone') or ''}")
                     c1, c2 = st.columns(2)
                     with c1:
-                        if st.button("Aceptar", key=f"acc_{it['id']}"):
-                            svc.respond_contact_request(it["id"], "accepted")
-                            try:
-                                cdb = db_conn()
-                                cr = cdb.execute("SELECT from_user_id, requirement_id FROM contact_requests WHERE id=?", (int(it["id"]),)).fetchone()
-                                if cr:
-                                    req = svc.get_requirement(int(cr["requirement_id"]))
-                                    owner = cdb.execute("SELECT email, name FROM users WHERE id=?", (int(req["user_id"]),)).fetchone()
-                                    sender = cdb.execute("SELECT email, name FROM users WHERE id=?", (int(cr["from_user_id"]),)).fetchone()
-                                    mailer.notify_accept_both(
-                                        owner_email=(owner["email"] if owner else ""),
-                                        owner_name=(owner["name"] if owner else ""),
-                                        sender_email=(sender["email"] if sender else ""),
-                                        sender_name=(sender["name"] if sender else ""),
-                                        kind=(req.get("type") or ""),
-                                        title=(req.get("title") or ""),
-                                        company=(req.get("company") or ""),
-                                    )
-                                cdb.close()
-                            except Exception:
-                                try:
-                                    cdb.close()
-                                except Exception:
-                                    pass
-                            st.success("Aceptada.")
-                            st.rerun()
+                        st.button("Aceptar", key=f"acc_{it['id']}", on_click=_accept_contact, args=(it["id"],))
                     with c2:
-                        if st.button("Rechazar", key=f"dec_{it['id']}"):
-                            svc.respond_contact_request(it["id"], "declined")
-                            st.info("Rechazada.")
-                            st.rerun()
+                        st.button("Rechazar", key=f"dec_{it['id']}", on_click=_decline_contact, args=(it["id"],))
 
         st.divider()
         
@@ -1451,25 +2005,30 @@ def main():
         if not mine:
             st.write("Todavía no publicaste requerimientos.")
         else:
+            # Resumen de TODAS las publicaciones en un único bloque HTML
+            # (antes: un st.columns + st.markdown + botón por fila)
+            summary_parts = []
             for r in mine:
                 status_r = (r.get("status") or "open").lower()
+                kind = _KIND_LABEL.get(r.get("type"), "OFERTA")
+                color, badge = _STATUS_STYLE.get(status_r, ("black", ""))
+                summary_parts.append(
+                    _ROW_TPL.format(c=color, i=r["id"], k=kind, t=html.escape(str(r["title"])), b=badge)
+                )
+            st.markdown("".join(summary_parts), unsafe_allow_html=True)
+
+            # Solo la publicación elegida construye su ficha completa
+            pick_labels = {f"#{r['id']} · {r['title']}": int(r["id"]) for r in mine}
+            sel_pick = st.selectbox("Editar publicación", ["(Ninguna)", *pick_labels], key="my_edit_pick")
+            sel_id = pick_labels.get(sel_pick)
+
+            for r in mine:
+                if sel_id is None or int(r["id"]) != sel_id:
+                    continue
+                status_r = (r.get("status") or "open").lower()
                 is_ann = status_r == "annulled"
-                kind = "NECESIDAD" if r.get("type") == "need" else "OFERTA"
-                color = "red" if is_ann else "black"
-                badge = " 🟥 ANULADO" if is_ann else ""
-
-                open_key = f"edit_open_{r['id']}"
-                cols = st.columns([8, 2])
-                with cols[0]:
-                    st.markdown(
-                        f"<div style='color:{color}; font-weight:600'>#{r['id']} · {kind} · {r['title']}{badge}</div>",
-                        unsafe_allow_html=True,
-                    )
-                with cols[1]:
-                    if st.button("✏️ Editar", key=f"btn_edit_{r['id']}"):
-                        st.session_state[open_key] = not st.session_state.get(open_key, False)
 
-                with st.expander("Ficha de publicación", expanded=st.session_state.get(open_key, False)):
+                with st.expander("Ficha de publicación", expanded=True):
                     if is_ann:
                         st.markdown("<div style='color:red; font-weight:700'>REQUERIMIENTO ANULADO POR MODERACIÓN</div>", unsafe_allow_html=True)
 
@@ -1484,12 +2043,24 @@ def main():
                         st.caption("Este requerimiento fue anulado por moderación y no puede editarse.")
                         continue
 
-                    cover = svc.get_cover_image_bytes(r["id"])
-                    if cover and cover.get("bytes"):
-                        st.image(cover["bytes"], width=320)
+                    atts = svc.list_attachments(r["id"])
+
+                    # Portada: primera imagen del bucket ya traído (misma
+                    # regla que get_cover_image_bytes), bytes desde el cache
+                    cover_att = next(
+                        (
+                            a for a in atts
+                            if str(a.get("mime") or "").lower().startswith("image/")
+                            or str(a.get("filename") or "").lower().rsplit(".", 1)[-1] in IMAGE_EXTS
+                        ),
+                        None,
+                    )
+                    if cover_att:
+                        cover_data = _att_bytes(cover_att["id"])
+                        if cover_data:
+                            st.image(cover_data, width=320)
 
                     st.markdown("#### Adjuntos")
-                    atts = svc.list_attachments(r["id"])
                     if atts and len(atts) > MAX_ATTACHMENTS:
                         st.caption(f"Se muestran los primeros {MAX_ATTACHMENTS} adjuntos (hay {len(atts)}).")
                     if not atts:
@@ -1499,21 +2070,32 @@ def main():
                             fname = a.get("filename") or "archivo"
                             size = int(a.get("size") or 0)
                             size_kb = f"{max(size/1024.0, 0.1):.0f} KB" if size else "?"
-                            data = svc.read_attachment_bytes(a["id"])
-                            mime = "application/pdf" if str(fname).lower().endswith(".pdf") else "application/octet-stream"
+                            mime = _EXT_MIME.get(str(fname).rpartition(".")[2].lower(), "application/octet-stream")
 
                             c_dl, c_del = st.columns([4, 1])
                             with c_dl:
-                                if data:
-                                    st.download_button(
-                                        label=f"⬇️ Descargar {fname} ({size_kb})",
-                                        data=data,
-                                        file_name=fname,
-                                        mime=mime,
-                                        key=f"dl_att_my_{a['id']}",
-                                    )
-                                else:
-                                    st.write(f"- {fname} ({size_kb}) — archivo no disponible")
+                                # Dos pasos: los bytes recién se leen del disco
+                                # cuando el usuario pide la descarga (antes se
+                                # cargaba TODO blob en cada rerun)
+                                ready_key = f"att_ready_my_{a['id']}"
+                                if st.session_state.get(ready_key):
+                                    data = _att_bytes(a["id"])
+                                    if data:
+                                        st.download_button(
+                                            label=f"⬇️ Descargar {fname} ({size_kb})",
+                                            data=data,
+                                            file_name=fname,
+                                            mime=mime,
+                                            key=f"dl_att_my_{a['id']}",
+                                        )
+                                    else:
+                                        st.write(f"- {fname} ({size_kb}) — archivo no disponible")
+                                elif st.button(
+                                    f"Preparar descarga de {fname} ({size_kb})",
+                                    key=f"prep_att_my_{a['id']}",
+                                ):
+                                    st.session_state[ready_key] = True
+                                    st.rerun()
                             with c_del:
                                 if st.button("🗑️", key=f"del_att_btn_{a['id']}"):
                                     ok = svc.delete_attachment(a["id"], u["id"], is_sa)
@@ -1533,9 +2115,10 @@ def main():
                         st.caption("Seleccionados: " + ", ".join([f.name for f in new_files]))
                         if len(new_files) > MAX_ATTACHMENTS:
                             st.warning(f"Seleccionaste {len(new_files)} adjuntos. El máximo permitido es {MAX_ATTACHMENTS}.")
-                        # Control adicional: total de adjuntos permitidos por publicación
-                        current_atts = svc.list_attachments(r["id"])
-                        remaining = max(0, MAX_ATTACHMENTS - (len(current_atts) if current_atts else 0))
+                        # Control adicional: total de adjuntos permitidos por
+                        # publicación (reusa la lista ya traída arriba, sin
+                        # repetir la consulta por fila)
+                        remaining = max(0, MAX_ATTACHMENTS - len(atts))
                         if remaining == 0:
                             st.error(f"Esta publicación ya tiene {MAX_ATTACHMENTS} adjuntos. Eliminá alguno para subir uno nuevo.")
                         else:
@@ -1553,8 +2136,8 @@ def main():
                         desc2 = st.text_area("Descripción", value=r["description"], height=120)
                         cat2 = st.selectbox(
                             "Categoría",
-                            ["(Sin categoría)"] + CATEGORIES,
-                            index=(["(Sin categoría)"] + CATEGORIES).index(r.get("category") or "(Sin categoría)"),
+                            _CATS_WITH_NONE,
+                            index=_CATS_WITH_NONE.index(r.get("category") or "(Sin categoría)"),
                         )
                         urg_val = r.get("urgency") or "media"
                         urg2 = st.selectbox(
@@ -1570,7 +2153,7 @@ def main():
                             "Estado",
                             status_options2,
                             index=status_options2.index(cur_status),
-                            format_func=lambda x: {"open": "abierto", "closed": "cerrado", "annulled": "anulado"}.get(x, x),
+                            format_func=_STATUS_LABELS.get,
                         )
 
                         save = st.form_submit_button("Guardar cambios")
@@ -1588,25 +2171,27 @@ def main():
                                     tags=tags2,
                                     status=status2,
                                 )
+                                _latest_open.clear()
+                                _search_cached.clear()
                                 st.success("Actualizado.")
                                 st.rerun()
 
     with t[3]:
         st.header("Panel")
-        m = svc.admin_metrics()
+        m = _cached_admin_metrics()
 
         # Mantener consistencia con la Vista Pública (misma lógica y mismos 6 indicadores)
-        r1 = st.columns(2)
-        r1[0].metric("Publicaciones activas", int(m.get("open_requirements", 0)))
-        r1[1].metric("Usuarios registrados", int(m.get("users", 0)))
-
-        r2 = st.columns(2)
-        r2[0].metric("Solicitudes pendientes", int(m.get("contacts_pending", 0)))
-        r2[1].metric("Contactos aprobados", int(m.get("contacts_accepted", 0)))
-
-        r3 = st.columns(2)
-        r3[0].metric("Cámaras", int(m.get("chambers", 0)))
-        r3[1].metric("Solicitudes rechazadas", int(m.get("contacts_declined", 0)))
+        # Una sola fila de columnas en vez de tres contenedores de layout
+        metric_defs = [
+            ("Publicaciones activas", "open_requirements"),
+            ("Usuarios registrados", "users"),
+            ("Solicitudes pendientes", "contacts_pending"),
+            ("Contactos aprobados", "contacts_accepted"),
+            ("Cámaras", "chambers"),
+            ("Solicitudes rechazadas", "contacts_declined"),
+        ]
+        for col, (lbl, k) in zip(st.columns(6), metric_defs):
+            col.metric(lbl, int(m.get(k, 0)))
 
         st.subheader("Requerimientos por cámara")
         if m["requirements_by_chamber"]:
@@ -1615,18 +2200,28 @@ def main():
 
 
         # Usuarios (solo Super Admin): permite auditar registros y detectar cuentas inesperadas
-        if u and is_super_admin(_uget(u, "email", "")):
+        if is_sa:
+            # Una sola lectura de cámaras compartida por el editor de
+            # usuarios y la grilla de administración de cámaras
+            chambers_all = _cached_chambers()[0]
+
             st.divider()
             st.subheader("Usuarios registrados (solo Super Admin)")
             q_user = st.text_input("Buscar usuario (email, nombre o empresa)", key="su_user_search")
-            users_list = svc.list_users(q_user or None)
+            # Proyección en SQL: solo las columnas que la grilla edita
+            users_list = svc.list_users(
+                q_user or None,
+                columns=(
+                    "id", "email", "name", "company", "chamber_id", "chamber_name",
+                    "phone", "role", "is_active", "is_approved", "approved_at",
+                ),
+            )
             st.caption(f"Total: {len(users_list)} usuario(s).")
             if users_list:
                 # Edición directa (tipo Excel) para pequeñas correcciones administrativas
-                df_full_u = pd.DataFrame(users_list)
+                _ensure_pd()
 
                 # Opciones de cámara para edición rápida
-                chambers_all = svc.list_chambers()
                 chamber_label_none = "Sin cámara"
                 chamber_options = [chamber_label_none] + [c.get("name") for c in chambers_all if c.get("name")]
                 chamber_name_to_id = {c.get("name"): int(c.get("id")) for c in chambers_all if c.get("name") and c.get("id") is not None}
@@ -1642,18 +2237,22 @@ def main():
                     "is_approved",
                     "approved_at",
                 ]
-                df_u = df_full_u.copy()
+                # Un solo DataFrame (sin copias intermedias): la proyección
+                # ya vino acotada desde SQL
+                df_u = pd.DataFrame(users_list)
                 # Normalizar visualización de cámara
-                if "chamber_name" in df_u.columns:
-                    df_u["chamber"] = df_u["chamber_name"].fillna(chamber_label_none)
-                elif "chamber" not in df_u.columns:
-                    df_u["chamber"] = chamber_label_none
-
-                df_u = df_u[[c for c in cols if c in df_u.columns]].copy()
-                if "is_active" in df_u.columns:
-                    df_u["is_active"] = df_u["is_active"].fillna(0).astype(int).astype(bool)
-                if "is_approved" in df_u.columns:
-                    df_u["is_approved"] = df_u["is_approved"].fillna(0).astype(int).astype(bool)
+                df_u["chamber"] = df_u.pop("chamber_name").fillna(chamber_label_none)
+                # Mapa id_usuario -> chamber_id original (se usa en el diff)
+                _ch = pd.to_numeric(df_u.pop("chamber_id"), errors="coerce")
+                _ch.index = df_u["id"].astype(int)
+                # object + None (no NaN): el diff compara contra int o None
+                orig_chamber_id = _ch.astype(object).where(_ch.notna(), None).to_dict()
+                df_u = df_u[[c for c in cols if c in df_u.columns]]
+                # Una sola pasada por columna: list_users ya normaliza a 0/1,
+                # así que alcanza con el cast al dtype booleano de pandas
+                for _bcol in ("is_active", "is_approved"):
+                    if _bcol in df_u.columns:
+                        df_u[_bcol] = df_u[_bcol].astype("boolean")
 
                 edited_u = st.data_editor(
                     df_u,
@@ -1682,38 +2281,19 @@ def main():
                 )
 
                 if st.button("💾 Guardar cambios (usuarios)", key="su_users_save"):
-                    def _norm_s(v):
-                        try:
-                            if pd.isna(v):
-                                return None
-                        except Exception:
-                            pass
-                        if v is None:
-                            return None
-                        s = str(v).strip()
-                        return s if s != "" else None
-
                     orig = df_u.set_index("id")
                     new = edited_u.set_index("id")
-                    # Mapa id_usuario -> chamber_id (normalizado)
-                    orig_chamber_id = {}
-                    try:
-                        if "chamber_id" in df_full_u.columns and "id" in df_full_u.columns:
-                            for _row in df_full_u[["id", "chamber_id"]].itertuples(index=False):
-                                uid0 = int(getattr(_row, "id"))
-                                v = getattr(_row, "chamber_id")
-                                try:
-                                    if pd.isna(v):
-                                        v = None
-                                except Exception:
-                                    pass
-                                orig_chamber_id[uid0] = (int(v) if v is not None else None)
-                    except Exception:
-                        orig_chamber_id = {}
-                    changed = 0
+                    updates = []
                     errors = []
 
-                    for uid in new.index:
+                    # Diff vectorizado: la máscara de cambios se calcula en C
+                    # (pandas) y el loop de normalización/validación por campo
+                    # solo corre para las filas realmente editadas.
+                    orig_cmp = orig.astype(str).apply(lambda s: s.str.strip())
+                    new_cmp = new.astype(str).apply(lambda s: s.str.strip())
+                    changed_ids = new.index[(orig_cmp != new_cmp).any(axis=1)]
+
+                    for uid in changed_ids:
                         try:
                             o = orig.loc[uid]
                         except Exception:
@@ -1786,11 +2366,15 @@ def main():
                         if not fields:
                             continue
 
+                        updates.append((int(uid), fields))
+
+                    # Un solo executemany/commit para todas las filas editadas
+                    changed = 0
+                    if updates:
                         try:
-                            svc.update_user_superadmin(int(uid), **fields)
-                            changed += 1
+                            changed = svc.update_users_superadmin_bulk(updates)
                         except Exception as e:
-                            errors.append(f"Usuario #{uid}: {e}")
+                            errors.append(f"No se aplicó el lote de usuarios: {e}")
 
                     if errors:
                         st.error("Se aplicaron cambios parciales. Detalles:\n- " + "\n- ".join(errors))
@@ -1804,8 +2388,9 @@ def main():
 
             st.divider()
             st.subheader("Administración de Cámaras (solo Super Admin)")
-            chambers = svc.list_chambers()
+            chambers = chambers_all
             if chambers:
+                _ensure_pd()
                 df_c = pd.DataFrame(chambers)
                 df_c = df_c[[c for c in ["id", "name", "province", "city"] if c in df_c.columns]].copy()
 
@@ -1822,22 +2407,17 @@ def main():
                 )
 
                 if st.button("💾 Guardar cambios (cámaras)", key="su_chambers_save"):
-                    def _norm_s(v):
-                        try:
-                            if pd.isna(v):
-                                return None
-                        except Exception:
-                            pass
-                        if v is None:
-                            return None
-                        s = str(v).strip()
-                        return s if s != "" else None
-
                     origc = df_c.set_index("id")
                     newc = edited_c.set_index("id")
-                    changed_c = 0
+                    updates_c = []
                     errors_c = []
-                    for cid in newc.index:
+
+                    # Mismo diff vectorizado que en la grilla de usuarios
+                    origc_cmp = origc.astype(str).apply(lambda s: s.str.strip())
+                    newc_cmp = newc.astype(str).apply(lambda s: s.str.strip())
+                    changed_cids = newc.index[(origc_cmp != newc_cmp).any(axis=1)]
+
+                    for cid in changed_cids:
                         try:
                             o = origc.loc[cid]
                         except Exception:
@@ -1860,15 +2440,19 @@ def main():
                             fields["city"] = city_n
                         if not fields:
                             continue
+                        updates_c.append((int(cid), fields))
+
+                    changed_c = 0
+                    if updates_c:
                         try:
-                            svc.update_chamber_superadmin(int(cid), **fields)
-                            changed_c += 1
+                            changed_c = svc.update_chambers_superadmin_bulk(updates_c)
                         except Exception as e:
-                            errors_c.append(f"Cámara #{cid}: {e}")
+                            errors_c.append(f"No se aplicó el lote de cámaras: {e}")
 
                     if errors_c:
                         st.error("Se aplicaron cambios parciales. Detalles:\n- " + "\n- ".join(errors_c))
                     if changed_c:
+                        _cached_chambers.clear()
                         st.success(f"Cambios guardados en {changed_c} cámara(s).")
                         st.rerun()
                     else:
@@ -1881,6 +2465,7 @@ def main():
                 ok2 = st.form_submit_button("Crear cámara")
                 if ok2:
                     if svc.create_chamber(nm.strip(), loc.strip() or None):
+                        _cached_chambers.clear()
                         st.success("Cámara creada.")
                         st.rerun()
                     else:
@@ -1894,29 +2479,16 @@ def main():
 
         subt = st.tabs(["📥 Recibidas", "📤 Enviadas"])
 
-        def _fmt_contact(name: str, email: str, phone: str, company: str = None) -> str:
-            bits = []
-            if name:
-                bits.append(name)
-            if company:
-                bits.append(company)
-            if email:
-                bits.append(email)
-            if phone:
-                bits.append(phone)
-            return " · ".join(bits) if bits else "-"
-
         # -------------------- Recibidas (inbox) --------------------
         with subt[0]:
             st.subheader("📥 Recibidas por mis publicaciones")
             st.caption("Solicitudes de contacto recibidas por tus publicaciones (queda el historial aunque ya las aceptes/rechaces).")
 
             def _show_inbox(item):
-                kind = "OFERTA" if item.get("type") == "offer" else "NECESIDAD"
-                title = item.get("title") or "(sin título)"
+                # Strings derivados ya precomputados en _inbox_grouped_cached
                 status = (item.get("status") or "").strip().lower() or "pending"
 
-                st.write(f"**Solicitud #{item['id']} — {kind} #{item['requirement_id']} · {title}**")
+                st.write(f"**Solicitud #{item['id']} — {item['_kind']} #{item['requirement_id']} · {item['_title']}**")
                 st.write(f"Estado: **{status}**")
                 if item.get("created_at"):
                     st.write(f"Creada: {item.get('created_at')}")
@@ -1929,23 +2501,14 @@ def main():
                     with c1:
                         if st.button("✅ Aceptar", key=f"acc_inbox_{item['id']}"):
                             svc.respond_contact_request(int(item["id"]), "accepted")
-                            try:
-                                mailer.notify_accept_both(
-                                    owner_email=(item.get("to_email") or ""),
-                                    owner_name=(item.get("to_name") or ""),
-                                    sender_email=(item.get("from_email") or ""),
-                                    sender_name=(item.get("from_name") or ""),
-                                    kind=kind,
-                                    title=title,
-                                    company=(item.get("company") or ""),
-                                )
-                            except Exception:
-                                pass
+                            _notify_accept_async(int(item["id"]))
+                            _inbox_grouped_cached.clear()
                             st.success("Solicitud aceptada.")
                             st.rerun()
                     with c2:
                         if st.button("⛔ Rechazar", key=f"dec_inbox_{item['id']}"):
                             svc.respond_contact_request(int(item["id"]), "declined")
+                            _inbox_grouped_cached.clear()
                             st.info("Solicitud rechazada.")
                             st.rerun()
 
@@ -1954,23 +2517,17 @@ def main():
 
                 # Regla: no mostrar email/teléfono hasta que se acepte
                 if status != "accepted":
-                    st.write("- Interesado: " + (item.get("from_name") or "(sin nombre)") + " · " + (item.get("from_company") or "(sin empresa)"))
+                    st.write("- Interesado: " + item["_from_short"])
                     st.caption("Los datos de contacto (email/teléfono) se habilitan únicamente cuando aceptás la solicitud.")
                 else:
-                    def _fmt_full(name: str, company: str, email: str, phone: str) -> str:
-                        parts = []
-                        if name: parts.append(name)
-                        if company: parts.append(company)
-                        if email: parts.append(email)
-                        if phone: parts.append(phone)
-                        return " · ".join(parts) if parts else "-"
+                    st.write("- Interesado: " + item["_from_contact"])
+                    st.write("- Tu contacto: " + item["_to_contact"])
 
-                    st.write("- Interesado: " + _fmt_full(item.get("from_name",""), item.get("from_company",""), item.get("from_email",""), item.get("from_phone","")))
-                    st.write("- Tu contacto: " + _fmt_full(item.get("to_name",""), item.get("to_company",""), item.get("to_email",""), item.get("to_phone","")))
-
-            accepted = svc.list_inbox(u["id"], status="accepted")
-            pending = svc.list_inbox(u["id"], status="pending")
-            declined = svc.list_inbox(u["id"], status="declined")
+            # Una sola consulta cacheada (ttl=15) con strings ya formateados
+            by_status = _inbox_grouped_cached(int(u["id"]))
+            accepted = by_status["accepted"]
+            pending = by_status["pending"]
+            declined = by_status["declined"]
 
             st.markdown("---")
             st.markdown("## ✅ Aceptadas")
@@ -2008,9 +2565,7 @@ def main():
             )
 
             def _show_outbox(item):
-                kind = "OFERTA" if item.get("type") == "offer" else "NECESIDAD"
-                title = item.get("title") or "(sin título)"
-                st.write(f"**Solicitud #{item['id']} — a {item.get('to_name','-')} · {kind} #{item['requirement_id']} · {title}**")
+                st.write(f"**Solicitud #{item['id']} — a {item.get('to_name','-')} · {item['_kind']} #{item['requirement_id']} · {item['_title']}**")
                 st.write(f"Estado: **{item.get('status')}**")
                 if item.get("created_at"):
                     st.write(f"Creada: {item.get('created_at')}")
@@ -2020,23 +2575,21 @@ def main():
                 st.write("")
                 st.write("**Contactos:**")
                 # Tu contacto siempre
-                st.write(
-                    f"- **Tu contacto:** {_fmt_contact(item.get('from_name'), item.get('from_email'), item.get('from_phone'), item.get('from_company'))}"
-                )
+                st.write(f"- **Tu contacto:** {item['_from_contact']}")
 
                 # Contacto del dueño: solo si aceptada
                 if str(item.get("status")) == "accepted":
-                    st.write(
-                        f"- **Dueño de la publicación:** {_fmt_contact(item.get('to_name'), item.get('to_email'), item.get('to_phone'), item.get('to_company'))}"
-                    )
+                    st.write(f"- **Dueño de la publicación:** {item['_to_contact']}")
                 else:
                     st.write(
                         f"- **Dueño de la publicación:** {item.get('to_name','-')} · {item.get('to_company') or '-'} · (contacto disponible al aceptar)"
                     )
 
-            accepted = svc.list_outbox(u["id"], status="accepted")
-            pending = svc.list_outbox(u["id"], status="pending")
-            declined = svc.list_outbox(u["id"], status="declined")
+            # Igual que en Recibidas: una consulta cacheada ya formateada
+            by_status_out = _outbox_grouped_cached(int(u["id"]))
+            accepted = by_status_out["accepted"]
+            pending = by_status_out["pending"]
+            declined = by_status_out["declined"]
 
             st.markdown("---")
             st.markdown("## ✅ Aceptadas")
@@ -2069,8 +2622,10 @@ def main():
         st.header("Asistente IA")
         st.caption("Chat de ayuda sobre el funcionamiento y consultas (modo local/IA).")
 
+        # Historial acotado: cada rerun re-renderiza TODO el historial, así
+        # que sin tope el costo por mensaje crece sin límite en sesiones largas
         if "chat" not in st.session_state:
-            st.session_state["chat"] = []
+            st.session_state["chat"] = deque(maxlen=100)
 
         for msg in st.session_state["chat"]:
             with st.chat_message(msg["role"]):
@@ -2082,14 +2637,13 @@ def main():
             with st.chat_message("user"):
                 st.markdown(q)
 
-            out = assistant_answer(q, role=role)
-            ans = out.get("answer", "")
+            # Streaming: el texto aparece a medida que llega (time-to-first-token)
+            # en vez de bloquear hasta tener la respuesta completa. La variante
+            # stream es solo texto; las tablas siguen saliendo por el sidebar.
             with st.chat_message("assistant"):
-                st.markdown(ans)
-                if out.get("table") is not None:
-                    st.dataframe(out["table"], use_container_width=True)
+                ans = st.write_stream(assistant_answer_stream(q, role=role))
 
-            st.session_state["chat"].append({"role": "assistant", "content": ans})
+            st.session_state["chat"].append({"role": "assistant", "content": str(ans)})
 
 
     # Tab extra: administración (solo Super Admin)
@@ -2101,7 +2655,7 @@ def main():
             st.header("Dar de alta (solo Super Admin)")
 
             st.subheader("Super Administradores")
-            current_sas = get_super_admin_emails()
+            current_sas = _cached_super_admin_emails()
             if current_sas:
                 st.write("**Super Admin(s) actuales:** " + ", ".join(current_sas))
             else:
@@ -2127,10 +2681,8 @@ def main():
                         if urow:
                             # Actualiza nombre si se proporcionó
                             if nm and (urow["name"] or "").strip() != nm:
-                                c = db_conn()
-                                c.execute("UPDATE users SET name=? WHERE email=?", (nm, em))
-                                c.commit()
-                                c.close()
+                                with _write_conn() as c:
+                                    c.execute("UPDATE users SET name=? WHERE email=?", (nm, em))
                         else:
                             if not create_if_missing:
                                 st.error("El usuario no existe. Activá la opción de crearlo acá o pedile que se registre.")
@@ -2148,6 +2700,8 @@ def main():
 
                         # Otorga permiso SA (idempotente)
                         add_super_admin_email(em)
+                        is_super_admin.cache_clear()
+                        _cached_super_admin_emails.clear()
                         st.success("Permisos de Super Admin otorgados.")
                         if temp_pass:
                             st.info(f"Usuario creado. Contraseña temporal: `{temp_pass}`")
@@ -2155,7 +2709,7 @@ def main():
 
             st.divider()
             st.subheader("Quitar permisos de Super Admin")
-            current_sas = get_super_admin_emails()
+            current_sas = _cached_super_admin_emails()
             if not current_sas:
                 st.caption("Sin Super Admins.")
             else:
@@ -2166,109 +2720,21 @@ def main():
                         st.error("No se puede quitar el último Super Admin.")
                     else:
                         remove_super_admin_email(pick)
+                        is_super_admin.cache_clear()
+                        _cached_super_admin_emails.clear()
                         st.success("Permisos quitados.")
                         st.rerun()
 
             # --- Gestión de administradores (solo Super Admin) ---
             st.divider()
-            st.subheader("Gestión de Administradores")
-            st.caption(
-                "El **Super Admin** puede: **Suspender** (reversible) o **Anular** (desactiva) a los usuarios con rol **admin**."
-            )
-
-            admins = svc.list_admin_users(limit=500)
-            if not admins:
-                st.info("No hay administradores dados de alta.")
-            else:
-                for a in admins:
-                    status_txt = "ANULADO" if int(a.get("is_active", 0)) == 0 else ("SUSPENDIDO" if int(a.get("is_suspended", 0)) == 1 else "ACTIVO")
-                    head = f"#{a['id']} · {a.get('email')} · {a.get('name') or '(Sin nombre)'} · **{status_txt}**"
-                    with st.expander(head):
-                        st.write(f"Empresa: {a.get('company') or '-'}")
-                        if a.get("phone"):
-                            st.write(f"Tel: {a.get('phone')}")
-                        # Evitar acciones sobre el propio Super Admin si también figura como admin
-                        if str(a.get("email", "")).strip().lower() in set([e.lower() for e in get_super_admin_emails()]):
-                            st.info("Este usuario tiene permisos de **Super Admin**. Para suspender/anular, primero quitá el permiso de Super Admin.")
-                            continue
-
-                        c1, c2 = st.columns(2)
-                        with c1:
-                            if int(a.get("is_active", 0)) == 1:
-                                if int(a.get("is_suspended", 0)) == 0:
-                                    if st.button("⏸️ Suspender", key=f"sus_{a['id']}", use_container_width=True):
-                                        svc.set_user_suspended(int(a["id"]), True, actor_user_id=int(u["id"]))
-                                        st.warning("Administrador suspendido.")
-                                        st.rerun()
-                                else:
-                                    if st.button("▶️ Reactivar", key=f"unsus_{a['id']}", use_container_width=True):
-                                        svc.set_user_suspended(int(a["id"]), False, actor_user_id=int(u["id"]))
-                                        st.success("Administrador reactivado.")
-                                        st.rerun()
-                            else:
-                                st.caption("Cuenta desactivada.")
-
-                        with c2:
-                            if int(a.get("is_active", 0)) == 1:
-                                if st.button("🗑️ Anular (desactivar)", key=f"anular_{a['id']}", use_container_width=True):
-                                    svc.deactivate_user(int(a["id"]), actor_user_id=int(u["id"]))
-                                    st.error("Administrador anulado (cuenta desactivada).")
-                                    st.rerun()
+            _admin_users_fragment(u)
 
             st.divider()
-            st.subheader("Moderación rápida")
-            st.caption("Listado práctico para moderar publicaciones. La acción **Anular** las saca de circulación.")
-            qmod = st.text_input("Buscar (título/desc/empresa/tags)", key="sa_mod_q")
-            status_mod = st.selectbox(
-                "Estado",
-                ["(Todos)", "open", "closed", "annulled"],
-                key="sa_mod_status",
-                format_func=lambda x: {"(Todos)": "(Todos)", "open": "abierto", "closed": "cerrado", "annulled": "anulado"}.get(x, x),
-            )
-            status_param = "" if status_mod == "(Todos)" else status_mod
-            reqs_mod = svc.search_requirements(q=qmod, type_="(Todos)", status=status_param, chamber_id=None, limit=50)
-
-            st.caption(f"Mostrando {len(reqs_mod)} requerimiento(s).")
-            for r in reqs_mod:
-                with st.expander(f"#{r['id']} · {('NECESIDAD' if r['type']=='need' else 'OFERTA')} · {r['title']}"):
-                    st.write(f"**Empresa:** {r.get('company') or '-'}")
-                    st.write(f"**Cámara:** {r.get('chamber_name') or '(Sin cámara)'}")
-                    st.write(f"**Estado:** { {'open':'abierto','closed':'cerrado','annulled':'anulado'}.get(r.get('status'), r.get('status')) }")
-                    st.write(r.get("description") or "")
-                    if r.get("status") != "annulled":
-                        if st.button("⚠️ Anular requerimiento", key=f"sa_annul_{r['id']}", use_container_width=True):
-                            svc.update_requirement(r["id"], status="annulled")
-                            st.warning("Requerimiento anulado.")
-                            st.rerun()
-                    else:
-                        st.info("Este requerimiento ya está **ANULADO**.")
+            _moderation_fragment()
 
 
         with t[validate_tab_idx]:
-            st.header("Validar usuarios (solo Super Admin)")
-            pending = svc.list_pending_users()
-            if not pending:
-                st.info("No hay usuarios pendientes de validación.")
-            else:
-                st.caption(f"Pendientes: {len(pending)}")
-                for pu in pending:
-                    st.markdown("---")
-                    st.markdown(f"**{pu.get('name','(Sin nombre)')}** — {pu.get('company','(Sin empresa)')}")
-                    st.write(f"Email: {pu.get('email')}")
-                    if pu.get("phone"):
-                        st.write(f"Tel: {pu.get('phone')}")
-                    st.caption(f"Registrado: {pu.get('created_at')}")
-                    c1, c2 = st.columns(2)
-                    with c1:
-                        if st.button("✅ Aprobar", key=f"approve_{pu['id']}", use_container_width=True):
-                            svc.approve_user(int(pu["id"]), approved_by_user_id=int(u["id"]))
-                            st.success("Usuario aprobado.")
-                            st.rerun()
-                    with c2:
-                        if st.button("⛔ Rechazar", key=f"reject_{pu['id']}", use_container_width=True):
-                            svc.reject_user(int(pu["id"]), rejected_by_user_id=int(u["id"]))
-                            st.warning("Usuario rechazado (cuenta desactivada).")
-                            st.rerun()
+            _validate_users_fragment(u)
 
 
 
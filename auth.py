@@ -1,4 +1,5 @@
 import bcrypt
+import functools
 import os
 import sqlite3
 
@@ -172,8 +173,13 @@ def any_admin_exists():
     return row is not None
 
 
+@functools.lru_cache(maxsize=64)
 def is_super_admin(email: str) -> bool:
-    """True si el email corresponde a algún Super Admin configurado."""
+    """True si el email corresponde a algún Super Admin configurado.
+
+    Memoizado por proceso: la lista casi nunca cambia y esto se consulta en
+    cada rerun. Quien modifique la lista debe llamar is_super_admin.cache_clear().
+    """
     try:
         e = (email or "").strip().lower()
         return e in set(get_super_admin_emails())
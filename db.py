@@ -27,10 +27,16 @@ def now_iso() -> str:
 
 
 def _raw_conn() -> sqlite3.Connection:
-    c = sqlite3.connect(str(DB_PATH), check_same_thread=False)
+    # cached_statements amplio: las mismas consultas se repiten en cada rerun
+    # y así SQLite reutiliza los prepared statements en vez de re-parsear SQL.
+    c = sqlite3.connect(str(DB_PATH), check_same_thread=False, cached_statements=256)
     c.row_factory = sqlite3.Row
     try:
         c.execute("PRAGMA foreign_keys = ON")
+        # WAL + synchronous NORMAL: escrituras concurrentes con lecturas y
+        # menos fsyncs, sin perder durabilidad ante crash de la app.
+        c.execute("PRAGMA journal_mode = WAL")
+        c.execute("PRAGMA synchronous = NORMAL")
     except Exception:
         pass
     return c
@@ -419,6 +425,25 @@ def _migrate_schema(c: sqlite3.Connection) -> None:
         _add_column_if_missing(c, "contact_requests", "created_at", "created_at TEXT")
         _add_column_if_missing(c, "contact_requests", "responded_at", "responded_at TEXT")
 
+    # Índice para los filtros calientes del panel de asistentes
+    # (usuarios por cámara + activos)
+    try:
+        c.execute(
+            "CREATE INDEX IF NOT EXISTS idx_users_chamber_active ON users(chamber_id, is_active)"
+        )
+    except Exception:
+        pass
+
+    # Índice cubriente para "últimas publicaciones abiertas" del panel
+    # público: sirve el top-N directo del índice, sin leer description.
+    try:
+        c.execute(
+            "CREATE INDEX IF NOT EXISTS idx_req_status_created "
+            "ON requirements(status, created_at DESC, type, title, company, location, chamber_id)"
+        )
+    except Exception:
+        pass
+
 
 def conn() -> sqlite3.Connection:
     init_db()
@@ -471,13 +496,45 @@ def set_backup_dir(path: str) -> None:
     set_setting("backup_dir", str(BACKUP_DIR))
 
 
+def _snapshot_db_to(dst: Path) -> None:
+    """Copia consistente de la DB usando la API de backup de SQLite.
+
+    Con journal_mode=WAL, copiar el archivo a mano puede dejar afuera
+    transacciones commiteadas que todavía viven en cpf.db-wal (y la copia
+    no es atómica si otro proceso escribe). Connection.backup() toma un
+    snapshot consistente que incluye lo pendiente del WAL.
+    """
+    src = _raw_conn()
+    try:
+        out = sqlite3.connect(str(dst))
+        try:
+            src.backup(out)
+        finally:
+            out.close()
+    finally:
+        src.close()
+
+
+def _remove_wal_sidecars() -> None:
+    """Borra cpf.db-wal / cpf.db-shm viejos antes de reabrir una DB restaurada.
+
+    Si quedan de la DB anterior, SQLite podría re-aplicar ese WAL sobre el
+    archivo recién restaurado.
+    """
+    for suffix in ("-wal", "-shm"):
+        try:
+            Path(str(DB_PATH) + suffix).unlink(missing_ok=True)
+        except Exception:
+            pass
+
+
 def backup_db(reason: str = "manual") -> str:
     """Create a .db copy inside BACKUP_DIR and store last path in settings."""
     init_db()
     BACKUP_DIR.mkdir(parents=True, exist_ok=True)
     ts = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
     dst = BACKUP_DIR / f"cpf_{ts}_{reason}.db"
-    shutil.copy2(DB_PATH, dst)
+    _snapshot_db_to(dst)
     set_setting("last_backup_path", str(dst))
     return str(dst)
 
@@ -501,6 +558,7 @@ def restore_db_from_path(path: str) -> None:
     if not src.exists():
         raise FileNotFoundError(str(src))
     shutil.copy2(src, DB_PATH)
+    _remove_wal_sidecars()
     _SCHEMA_READY = False
     init_db()
     try:
@@ -553,15 +611,21 @@ def backup_full(reason: str = "manual") -> str:
     ts = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
     dst = BACKUP_DIR / f"cpf_full_{ts}_{reason}.zip"
 
-    with zipfile.ZipFile(dst, "w", compression=zipfile.ZIP_DEFLATED) as z:
-        # DB
+    with tempfile.TemporaryDirectory(prefix="cpf_bak_") as td:
+        snap = Path(td) / "cpf.db"
         if DB_PATH.exists():
-            z.write(DB_PATH, arcname="cpf.db")
-        # uploads
-        for p in UPLOAD_DIR.glob("**/*"):
-            if p.is_file():
-                rel = Path("uploads") / p.relative_to(UPLOAD_DIR)
-                z.write(p, arcname=str(rel))
+            # Snapshot consistente (incluye el WAL), no una copia cruda
+            _snapshot_db_to(snap)
+
+        with zipfile.ZipFile(dst, "w", compression=zipfile.ZIP_DEFLATED) as z:
+            # DB
+            if snap.exists():
+                z.write(snap, arcname="cpf.db")
+            # uploads
+            for p in UPLOAD_DIR.glob("**/*"):
+                if p.is_file():
+                    rel = Path("uploads") / p.relative_to(UPLOAD_DIR)
+                    z.write(p, arcname=str(rel))
 
     set_setting("last_full_backup_path", str(dst))
     return str(dst)
@@ -604,8 +668,9 @@ def restore_full_from_zip_path(path: str) -> None:
         if not db_in.exists():
             raise ValueError("El ZIP no contiene cpf.db en la raíz")
 
-        # Reemplazar DB
+        # Reemplazar DB (sin dejar un WAL/SHM viejo que se re-aplique encima)
         shutil.copy2(db_in, DB_PATH)
+        _remove_wal_sidecars()
 
         # Reemplazar uploads
         UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
@@ -9,7 +9,7 @@ try:
     from PIL import Image
 except Exception:  # pragma: no cover
     Image = None
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from db import UPLOAD_DIR, conn, now_iso
 
@@ -162,20 +162,14 @@ def get_requirement(req_id: int) -> Optional[dict]:
     return dict(row) if row else None
 
 
-def search_requirements(
-    q: str = "",
-    type_: str = "(Todos)",
-    status: str = "open",
-    chamber_id: Optional[int] = None,
-    limit: int = 200,
-) -> List[dict]:
-    q = (q or "").strip()
-    sql = """SELECT r.id, r.type, r.title, r.description, r.category, r.urgency, r.tags,
-                    r.status, r.company, r.location, r.chamber_id, r.user_id, r.created_at,
-                    ch.name AS chamber_name
-             FROM requirements r
-             LEFT JOIN chambers ch ON ch.id = r.chamber_id
-             WHERE 1=1"""
+def _req_search_where(
+    q: str,
+    type_: str,
+    status: str,
+    chamber_id: Optional[int],
+) -> Tuple[str, List[Any]]:
+    """Arma el WHERE compartido entre search_requirements y count_requirements."""
+    sql = " WHERE 1=1"
     params: List[Any] = []
 
     if status:
@@ -200,8 +194,29 @@ def search_requirements(
                 )"""
         params.extend([like, like, like, like])
 
-    sql += " ORDER BY r.created_at DESC LIMIT ?"
-    params.append(int(limit))
+    return sql, params
+
+
+def search_requirements(
+    q: str = "",
+    type_: str = "(Todos)",
+    status: str = "open",
+    chamber_id: Optional[int] = None,
+    limit: int = 200,
+    offset: int = 0,
+) -> List[dict]:
+    q = (q or "").strip()
+    where, params = _req_search_where(q, type_, status, chamber_id)
+    sql = (
+        """SELECT r.id, r.type, r.title, r.description, r.category, r.urgency, r.tags,
+                    r.status, r.company, r.location, r.chamber_id, r.user_id, r.created_at,
+                    ch.name AS chamber_name
+             FROM requirements r
+             LEFT JOIN chambers ch ON ch.id = r.chamber_id"""
+        + where
+        + " ORDER BY r.created_at DESC LIMIT ? OFFSET ?"
+    )
+    params.extend([int(limit), int(offset)])
 
     c = conn()
     rows = c.execute(sql, params).fetchall()
@@ -209,6 +224,43 @@ def search_requirements(
     return [dict(r) for r in rows]
 
 
+def count_requirements(
+    q: str = "",
+    type_: str = "(Todos)",
+    status: str = "open",
+    chamber_id: Optional[int] = None,
+) -> int:
+    """Total de filas que devolvería search_requirements (para paginar)."""
+    q = (q or "").strip()
+    where, params = _req_search_where(q, type_, status, chamber_id)
+    c = conn()
+    row = c.execute("SELECT COUNT(*) FROM requirements r" + where, params).fetchone()
+    c.close()
+    return int(row[0] if row else 0)
+
+
+def search_requirements_summary(status: str = "open", limit: int = 10) -> List[dict]:
+    """Últimas publicaciones SIN description ni campos de detalle.
+
+    Para el panel público alcanza con estas columnas; evitar description
+    reduce ~10x los bytes leídos y deja la consulta cubierta por
+    idx_req_status_created (no toca el heap de la tabla).
+    """
+    c = conn()
+    rows = c.execute(
+        """SELECT r.id, r.type, r.title, r.company, r.location, r.created_at,
+                  ch.name AS chamber_name
+             FROM requirements r
+             LEFT JOIN chambers ch ON ch.id = r.chamber_id
+            WHERE r.status=?
+            ORDER BY r.created_at DESC
+            LIMIT ?""",
+        (status, int(limit)),
+    ).fetchall()
+    c.close()
+    return [dict(r) for r in rows]
+
+
 def list_user_requirements(user_id: int, limit: int = 200) -> List[dict]:
     c = conn()
     rows = c.execute(
@@ -226,13 +278,11 @@ def list_user_requirements(user_id: int, limit: int = 200) -> List[dict]:
 
 MAX_ATTACHMENTS = int(os.getenv("CPF_MAX_ATTACHMENTS", "2"))
 # -------------------- Adjuntos --------------------
-def save_attachment(
-    requirement_id: int,
-    uploaded_by_user_id: int,
-    filename: str,
-    content: bytes,
-    mime: Optional[str] = None,
-) -> int:
+def _validate_attachment(filename: str, content: bytes) -> str:
+    """Valida tamaño/extensión/firma de un adjunto y devuelve el nombre sanitizado.
+
+    Levanta ValueError con mensaje para el usuario si el archivo no pasa.
+    """
     # --- Seguridad básica en adjuntos (no reemplaza un antivirus) ---
     if content is None or len(content) == 0:
         raise ValueError("Adjunto vacío.")
@@ -273,13 +323,28 @@ def save_attachment(
         if content[:8] != b"\xD0\xCF\x11\xE0\xA1\xB1\x1A\xE1":
             raise ValueError("Archivo Office (doc/xls) inválido.")
 
-    UPLOAD_DIR.mkdir(exist_ok=True)
+    return safe
 
-    unique = f"r{int(requirement_id)}_{uuid.uuid4().hex}_{safe}"
-    stored_path = str((UPLOAD_DIR / unique).as_posix())
 
+def _store_attachment_file(requirement_id: int, safe_filename: str, content: bytes) -> str:
+    """Escribe el contenido en UPLOAD_DIR y devuelve la ruta almacenada."""
+    UPLOAD_DIR.mkdir(exist_ok=True)
+    unique = f"r{int(requirement_id)}_{uuid.uuid4().hex}_{safe_filename}"
+    stored_path = str((UPLOAD_DIR / unique).as_posix())
     with open(stored_path, "wb") as f:
         f.write(content)
+    return stored_path
+
+
+def save_attachment(
+    requirement_id: int,
+    uploaded_by_user_id: int,
+    filename: str,
+    content: bytes,
+    mime: Optional[str] = None,
+) -> int:
+    safe = _validate_attachment(filename, content)
+    stored_path = _store_attachment_file(requirement_id, safe, content)
 
     c = conn()
     cur = c.cursor()
@@ -302,19 +367,125 @@ def save_attachment(
     return att_id
 
 
-def list_attachments(requirement_id: int) -> List[dict]:
+def publish_with_attachments(
+    type_: str,
+    title: str,
+    description: str,
+    user_id: int,
+    company: str,
+    chamber_id: Optional[int] = None,
+    location: Optional[str] = None,
+    category: Optional[str] = None,
+    urgency: str = "Media",
+    tags: str = "",
+    attachments: Optional[List[Tuple[str, bytes, Optional[str]]]] = None,
+) -> Tuple[int, List[str]]:
+    """Crea el requerimiento y TODOS sus adjuntos en una sola transacción.
+
+    attachments: lista de (filename, content, mime). Un adjunto inválido no
+    frena la publicación: se devuelve la lista de avisos junto con el id.
+    Con la transacción única SQLite hace un solo fsync en vez de 1 + N.
+    """
+    warnings: List[str] = []
+    validated: List[Tuple[str, str, bytes, Optional[str]]] = []
+    for filename, content, mime in (attachments or []):
+        try:
+            validated.append((filename, _validate_attachment(filename, content), content, mime))
+        except Exception as e:
+            warnings.append(f"{filename}: {e}")
+
     c = conn()
-    rows = c.execute(
-        """SELECT id, filename, stored_path, mime, size, created_at, uploaded_by_user_id
+    try:
+        cur = c.cursor()
+        cur.execute("BEGIN IMMEDIATE")
+        ts = now_iso()
+        cur.execute(
+            """INSERT INTO requirements(type, title, description, category, urgency, tags, status,
+                                         company, location, chamber_id, user_id, created_at)
+               VALUES(?,?,?,?,?,?,?,?,?,?,?,?)""",
+            (
+                type_,
+                title.strip(),
+                description.strip(),
+                category,
+                urgency,
+                (tags or "").strip(),
+                "open",
+                company.strip(),
+                location,
+                chamber_id,
+                int(user_id),
+                ts,
+            ),
+        )
+        req_id = int(cur.lastrowid)
+
+        rows = []
+        for filename, safe, content, mime in validated:
+            try:
+                stored_path = _store_attachment_file(req_id, safe, content)
+            except Exception as e:
+                warnings.append(f"{filename}: {e}")
+                continue
+            rows.append((req_id, int(user_id), filename, stored_path, mime, len(content), ts))
+        if rows:
+            cur.executemany(
+                """INSERT INTO attachments(requirement_id, uploaded_by_user_id, filename, stored_path, mime, size, created_at)
+                   VALUES(?,?,?,?,?,?,?)""",
+                rows,
+            )
+        c.commit()
+    except Exception:
+        c.rollback()
+        raise
+    finally:
+        c.close()
+    return req_id, warnings
+
+
+def list_attachments(requirement_id: int, limit: Optional[int] = None) -> List[dict]:
+    """Adjuntos de una publicación. Con limit el recorte corre en SQL:
+    la UI que muestra los primeros N no necesita materializar el resto."""
+    sql = """SELECT id, filename, stored_path, mime, size, created_at, uploaded_by_user_id
            FROM attachments
            WHERE requirement_id=?
-           ORDER BY created_at ASC""",
-        (int(requirement_id),),
-    ).fetchall()
+           ORDER BY created_at ASC"""
+    params: List[Any] = [int(requirement_id)]
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(int(limit))
+    c = conn()
+    rows = c.execute(sql, params).fetchall()
     c.close()
     return [dict(r) for r in rows]
 
 
+def list_attachments_bulk(requirement_ids: List[int]) -> Dict[int, List[dict]]:
+    """Adjuntos de varias publicaciones en UNA consulta.
+
+    Evita el patrón N+1 de los listados (una query por fila renderizada):
+    devuelve {requirement_id: [adjuntos...]} con el mismo orden que
+    list_attachments.
+    """
+    ids = [int(i) for i in (requirement_ids or [])]
+    if not ids:
+        return {}
+    c = conn()
+    placeholders = ",".join("?" * len(ids))
+    rows = c.execute(
+        f"""SELECT id, requirement_id, filename, stored_path, mime, size, created_at, uploaded_by_user_id
+            FROM attachments
+            WHERE requirement_id IN ({placeholders})
+            ORDER BY created_at ASC""",
+        ids,
+    ).fetchall()
+    c.close()
+    out: Dict[int, List[dict]] = {}
+    for r in rows:
+        out.setdefault(int(r["requirement_id"]), []).append(dict(r))
+    return out
+
+
 def read_attachment_bytes(attachment_id: int) -> Optional[bytes]:
     """Devuelve el contenido (bytes) del archivo adjunto.
 
@@ -437,6 +608,22 @@ def add_attachments(requirement_id: int, files, uploaded_by_user_id: int) -> int
     return count
 
 # -------------------- Solicitudes de contacto --------------------
+def get_user_contact_min(user_id: int) -> Tuple[Optional[str], Optional[str]]:
+    """Devuelve (email, name) de un usuario, o (None, None) si no existe.
+
+    Lookup mínimo para las notificaciones por mail: evita abrir conexiones
+    ad-hoc desde la UI.
+    """
+    c = conn()
+    row = c.execute(
+        "SELECT email, name FROM users WHERE id=?", (int(user_id),)
+    ).fetchone()
+    c.close()
+    if not row:
+        return None, None
+    return row["email"], row["name"]
+
+
 def create_contact_request(from_user_id: int, to_user_id: int, requirement_id: int) -> int:
     # Hard safety: avoid self-requests (pueden aparecer por datos legacy/migrados)
     if int(from_user_id) == int(to_user_id):
@@ -526,6 +713,49 @@ def list_outbox(user_id: int, status: Optional[str] = "pending", limit: int = 20
     return [dict(r) for r in rows]
 
 
+def list_inbox_grouped(user_id: int, limit: int = 200) -> Dict[str, List[dict]]:
+    """Bandeja de entrada agrupada por estado en UNA sola consulta.
+
+    Devuelve {"accepted": [...], "pending": [...], "declined": [...]}
+    (antes: tres llamadas a list_inbox, una por estado).
+    """
+    groups: Dict[str, List[dict]] = {"accepted": [], "pending": [], "declined": []}
+    for it in list_inbox(user_id, status="all", limit=limit):
+        groups.setdefault((it.get("status") or "pending").lower(), []).append(it)
+    return groups
+
+
+def list_outbox_grouped(user_id: int, limit: int = 200) -> Dict[str, List[dict]]:
+    """Bandeja de salida agrupada por estado en UNA sola consulta."""
+    groups: Dict[str, List[dict]] = {"accepted": [], "pending": [], "declined": []}
+    for it in list_outbox(user_id, status="all", limit=limit):
+        groups.setdefault((it.get("status") or "pending").lower(), []).append(it)
+    return groups
+
+
+def get_contact_request_with_parties(request_id: int) -> Optional[dict]:
+    """Solicitud de contacto con los datos de ambas partes en UNA consulta.
+
+    Evita el patrón N+1 del handler de aceptación (contact_requests +
+    users del dueño + users del solicitante en 3 round-trips).
+    """
+    c = conn()
+    row = c.execute(
+        """SELECT cr.id, cr.from_user_id, cr.requirement_id,
+                  r.type, r.title, r.company, r.user_id AS owner_id,
+                  uo.email AS owner_email, uo.name AS owner_name,
+                  us.email AS sender_email, us.name AS sender_name
+             FROM contact_requests cr
+             JOIN requirements r ON r.id = cr.requirement_id
+             JOIN users uo ON uo.id = r.user_id
+             JOIN users us ON us.id = cr.from_user_id
+            WHERE cr.id=?""",
+        (int(request_id),),
+    ).fetchone()
+    c.close()
+    return dict(row) if row else None
+
+
 def respond_contact_request(request_id: int, status: str) -> None:
     if status not in ("accepted", "declined"):
         raise ValueError("status inválido")
@@ -592,24 +822,35 @@ def admin_metrics() -> Dict[str, Any]:
 
 # -------------------- User approval (Super Admin) --------------------
 
-def list_pending_users(limit: int = 200) -> List[dict]:
+def list_pending_users(limit: int = 200, offset: int = 0) -> List[dict]:
     c = conn()
     rows = c.execute(
         """SELECT id, email, name, company, phone, role, created_at
                FROM users
               WHERE is_active=1 AND COALESCE(is_approved,1)=0
               ORDER BY created_at DESC
-              LIMIT ?""",
-        (int(limit),),
+              LIMIT ? OFFSET ?""",
+        (int(limit), int(offset)),
     ).fetchall()
     c.close()
     return [dict(r) for r in rows]
 
 
-def list_pending_users_by_chamber(chamber_id: int, limit: int = 200) -> List[dict]:
+def count_pending_users() -> int:
+    """Total de usuarios pendientes de validación (para paginar)."""
+    c = conn()
+    row = c.execute(
+        "SELECT COUNT(*) FROM users WHERE is_active=1 AND COALESCE(is_approved,1)=0"
+    ).fetchone()
+    c.close()
+    return int(row[0] if row else 0)
+
+
+def list_pending_users_by_chamber(chamber_id: int, limit: int = 200, offset: int = 0) -> List[dict]:
     """Usuarios pendientes de validación para una cámara.
 
     Usado por rol "assistant" (moderador de cámara). No incluye asistentes.
+    La paginación corre en SQL (LIMIT/OFFSET) para no traer filas de más.
     """
     c = conn()
     rows = c.execute(
@@ -622,8 +863,8 @@ def list_pending_users_by_chamber(chamber_id: int, limit: int = 200) -> List[dic
                 AND u.chamber_id=?
                 AND LOWER(COALESCE(u.role,'user')) <> 'assistant'
               ORDER BY datetime(u.created_at) DESC, u.id DESC
-              LIMIT ?""",
-        (int(chamber_id), int(limit)),
+              LIMIT ? OFFSET ?""",
+        (int(chamber_id), int(limit), int(offset)),
     ).fetchall()
     c.close()
     return [dict(r) for r in rows]
@@ -652,6 +893,41 @@ def list_active_approved_users_by_chamber(chamber_id: int, limit: int = 500) ->
     return [dict(r) for r in rows]
 
 
+def search_approved_users_by_chamber(chamber_id: int, q: Optional[str] = None, limit: int = 1000) -> List[dict]:
+    """Como list_active_approved_users_by_chamber, pero con el filtro en SQL.
+
+    El panel del asistente traía hasta 1000 filas y las filtraba en Python
+    por cada tecleo; acá el LIKE corre en SQLite (con índice por cámara) y
+    solo viajan los matches.
+    """
+    qn = (q or "").strip().lower()
+    if not qn:
+        return list_active_approved_users_by_chamber(int(chamber_id), limit=limit)
+    like = f"%{qn}%"
+    c = conn()
+    rows = c.execute(
+        """SELECT u.id, u.email, u.name, u.company, u.phone, u.role,
+                  COALESCE(u.is_approved,1) AS is_approved,
+                  u.approved_at,
+                  u.created_at,
+                  ch.name AS chamber_name
+               FROM users u
+               LEFT JOIN chambers ch ON ch.id = u.chamber_id
+              WHERE u.is_active=1
+                AND COALESCE(u.is_approved,1)=1
+                AND u.chamber_id=?
+                AND LOWER(COALESCE(u.role,'user')) <> 'assistant'
+                AND (LOWER(COALESCE(u.email,'')) LIKE ?
+                     OR LOWER(COALESCE(u.name,'')) LIKE ?
+                     OR LOWER(COALESCE(u.company,'')) LIKE ?)
+              ORDER BY lower(COALESCE(u.company,'')) ASC, lower(COALESCE(u.name,'')) ASC
+              LIMIT ?""",
+        (int(chamber_id), like, like, like, int(limit)),
+    ).fetchall()
+    c.close()
+    return [dict(r) for r in rows]
+
+
 def approve_user_scoped(user_id: int, *, chamber_id: int, approved_by_user_id: Optional[int] = None) -> None:
     """Aprueba un usuario validando pertenencia a cámara.
 
@@ -840,7 +1116,7 @@ def reject_user(user_id: int, rejected_by_user_id: Optional[int] = None) -> None
     c.close()
 
 
-def list_admin_users(limit: int = 500) -> List[dict]:
+def list_admin_users(limit: int = 500, offset: int = 0) -> List[dict]:
     """Lista admins (incluye estado: activo/suspendido)."""
     c = conn()
     rows = c.execute(
@@ -851,8 +1127,8 @@ def list_admin_users(limit: int = 500) -> List[dict]:
              FROM users
             WHERE role='admin'
             ORDER BY created_at DESC
-            LIMIT ?""",
-        (int(limit),),
+            LIMIT ? OFFSET ?""",
+        (int(limit), int(offset)),
     ).fetchall()
     c.close()
     return [dict(r) for r in rows]
@@ -880,21 +1156,39 @@ def deactivate_user(user_id: int) -> None:
     c.close()
 
 
-def list_users(query: str | None = None):
-    """Lista usuarios (vista admin/super admin). No expone password_hash."""
+_USER_LIST_COLUMNS = {
+    "id": "u.id",
+    "email": "u.email",
+    "name": "u.name",
+    "company": "u.company",
+    "phone": "u.phone",
+    "role": "u.role",
+    "is_active": "u.is_active",
+    "is_approved": "COALESCE(u.is_approved, 1) AS is_approved",
+    "approved_at": "u.approved_at",
+    "is_suspended": "COALESCE(u.is_suspended, 0) AS is_suspended",
+    "suspended_at": "u.suspended_at",
+    "created_at": "u.created_at",
+    "chamber_id": "u.chamber_id",
+    "chamber_name": "ch.name AS chamber_name",
+}
+
+
+def list_users(query: str | None = None, columns=None):
+    """Lista usuarios (vista admin/super admin). No expone password_hash.
+
+    columns: proyección opcional (subconjunto de _USER_LIST_COLUMNS) para
+    no materializar campos que la vista no va a usar.
+    """
+    sel = [
+        _USER_LIST_COLUMNS[k]
+        for k in (columns or _USER_LIST_COLUMNS)
+        if k in _USER_LIST_COLUMNS
+    ]
     c = conn()
     q = (query or "").strip().lower()
-    sql = """
-        SELECT 
-            u.id, u.email, u.name, u.company, u.phone,
-            u.role, u.is_active,
-            COALESCE(u.is_approved, 1) AS is_approved,
-            u.approved_at,
-            COALESCE(u.is_suspended, 0) AS is_suspended,
-            u.suspended_at,
-            u.created_at,
-            u.chamber_id,
-            ch.name AS chamber_name
+    sql = f"""
+        SELECT {', '.join(sel)}
         FROM users u
         LEFT JOIN chambers ch ON ch.id = u.chamber_id
     """
@@ -910,28 +1204,23 @@ def list_users(query: str | None = None):
     for r in rows:
         d = dict(r)
         # normalizaciones
-        d["is_active"] = int(d.get("is_active", 0) or 0)
-        d["is_approved"] = int(d.get("is_approved", 0) or 0)
-        d["is_suspended"] = int(d.get("is_suspended", 0) or 0)
+        for k in ("is_active", "is_approved", "is_suspended"):
+            if k in d:
+                d[k] = int(d.get(k) or 0)
         out.append(d)
     return out
 
 
 # -------------------- Super Admin: edición rápida (tablas) --------------------
-def update_user_superadmin(
-    user_id: int,
-    **fields,
-) -> None:
-    """Actualiza campos administrativos de un usuario.
+_USER_ADMIN_FIELDS = {"email", "name", "company", "phone", "chamber_id", "role", "is_active", "is_approved", "approved_at"}
 
-    Diseñado para correcciones rápidas desde la grilla (solo Super Admin en la UI).
-    No toca password_hash.
-    """
-    allowed = {"email", "name", "company", "phone", "chamber_id", "role", "is_active", "is_approved", "approved_at"}
-    f = {k: fields.get(k) for k in fields.keys() if k in allowed}
-    if not f:
-        return
 
+def _normalize_user_admin_fields(f: Dict[str, Any], c) -> Dict[str, Any]:
+    """Normaliza/valida los campos administrativos de un usuario.
+
+    Usa la conexión recibida para validar chamber_id. Levanta ValueError
+    con mensaje para la UI si algo no pasa.
+    """
     # Normalizaciones / validaciones mínimas
     if "email" in f:
         email = (f.get("email") or "").strip().lower()
@@ -958,9 +1247,7 @@ def update_user_superadmin(
                 else:
                     ch_int = int(ch)
                     # Validar existencia
-                    c2 = conn()
-                    ok = c2.execute("SELECT 1 FROM chambers WHERE id=?", (ch_int,)).fetchone()
-                    c2.close()
+                    ok = c.execute("SELECT 1 FROM chambers WHERE id=?", (ch_int,)).fetchone()
                     if not ok:
                         raise ValueError(f"chamber_id inexistente ({ch_int})")
                     f["chamber_id"] = ch_int
@@ -997,28 +1284,77 @@ def update_user_superadmin(
         val = (f.get("approved_at") or "").strip() if isinstance(f.get("approved_at"), str) else f.get("approved_at")
         f["approved_at"] = val if val else None
 
-    keys = list(f.keys())
-    sets = ", ".join([f"{k}=?" for k in keys])
-    vals = [f[k] for k in keys] + [int(user_id)]
+    return f
+
+
+def update_user_superadmin(
+    user_id: int,
+    **fields,
+) -> None:
+    """Actualiza campos administrativos de un usuario.
+
+    Diseñado para correcciones rápidas desde la grilla (solo Super Admin en la UI).
+    No toca password_hash.
+    """
+    f = {k: fields.get(k) for k in fields.keys() if k in _USER_ADMIN_FIELDS}
+    if not f:
+        return
 
     c = conn()
     try:
+        f = _normalize_user_admin_fields(f, c)
+        keys = list(f.keys())
+        sets = ", ".join([f"{k}=?" for k in keys])
+        vals = [f[k] for k in keys] + [int(user_id)]
         c.execute(f"UPDATE users SET {sets} WHERE id=?", vals)
         c.commit()
     finally:
         c.close()
 
 
-def update_chamber_superadmin(
-    chamber_id: int,
-    **fields,
-) -> None:
-    """Actualiza datos de una cámara (solo Super Admin en la UI)."""
-    allowed = {"name", "province", "city"}
-    f = {k: fields.get(k) for k in fields.keys() if k in allowed}
-    if not f:
-        return
+def update_users_superadmin_bulk(updates: List[Tuple[int, Dict[str, Any]]]) -> int:
+    """Aplica varias correcciones de la grilla de usuarios en UNA transacción.
 
+    updates: [(user_id, fields)]. Agrupa por conjunto de columnas y usa
+    executemany por grupo: un solo commit/fsync en vez de uno por fila.
+    Todo o nada: si una fila no valida, se revierte el lote completo.
+    """
+    c = conn()
+    try:
+        norm: List[Tuple[int, Dict[str, Any]]] = []
+        for uid, fields in updates or []:
+            f = {k: v for k, v in (fields or {}).items() if k in _USER_ADMIN_FIELDS}
+            if not f:
+                continue
+            norm.append((int(uid), _normalize_user_admin_fields(f, c)))
+
+        if not norm:
+            return 0
+
+        groups: Dict[Tuple[str, ...], List[List[Any]]] = {}
+        for uid, f in norm:
+            key = tuple(sorted(f.keys()))
+            groups.setdefault(key, []).append([f[k] for k in key] + [uid])
+
+        cur = c.cursor()
+        cur.execute("BEGIN IMMEDIATE")
+        for key, rows in groups.items():
+            sets = ", ".join([f"{k}=?" for k in key])
+            cur.executemany(f"UPDATE users SET {sets} WHERE id=?", rows)
+        c.commit()
+        return len(norm)
+    except Exception:
+        c.rollback()
+        raise
+    finally:
+        c.close()
+
+
+_CHAMBER_ADMIN_FIELDS = {"name", "province", "city"}
+
+
+def _normalize_chamber_admin_fields(f: Dict[str, Any]) -> Dict[str, Any]:
+    """Normaliza/valida los campos editables de una cámara."""
     if "name" in f:
         nm = (f.get("name") or "").strip()
         if not nm:
@@ -1033,6 +1369,53 @@ def update_chamber_superadmin(
         city = (f.get("city") or "").strip()
         f["city"] = city if city else None
 
+    return f
+
+
+def update_chambers_superadmin_bulk(updates: List[Tuple[int, Dict[str, Any]]]) -> int:
+    """Aplica varias correcciones de cámaras en UNA transacción (executemany)."""
+    norm: List[Tuple[int, Dict[str, Any]]] = []
+    for cid, fields in updates or []:
+        f = {k: v for k, v in (fields or {}).items() if k in _CHAMBER_ADMIN_FIELDS}
+        if not f:
+            continue
+        norm.append((int(cid), _normalize_chamber_admin_fields(f)))
+
+    if not norm:
+        return 0
+
+    groups: Dict[Tuple[str, ...], List[List[Any]]] = {}
+    for cid, f in norm:
+        key = tuple(sorted(f.keys()))
+        groups.setdefault(key, []).append([f[k] for k in key] + [cid])
+
+    c = conn()
+    try:
+        cur = c.cursor()
+        cur.execute("BEGIN IMMEDIATE")
+        for key, rows in groups.items():
+            sets = ", ".join([f"{k}=?" for k in key])
+            cur.executemany(f"UPDATE chambers SET {sets} WHERE id=?", rows)
+        c.commit()
+        return len(norm)
+    except Exception:
+        c.rollback()
+        raise
+    finally:
+        c.close()
+
+
+def update_chamber_superadmin(
+    chamber_id: int,
+    **fields,
+) -> None:
+    """Actualiza datos de una cámara (solo Super Admin en la UI)."""
+    f = {k: fields.get(k) for k in fields.keys() if k in _CHAMBER_ADMIN_FIELDS}
+    if not f:
+        return
+
+    f = _normalize_chamber_admin_fields(f)
+
     keys = list(f.keys())
     sets = ", ".join([f"{k}=?" for k in keys])
     vals = [f[k] for k in keys] + [int(chamber_id)]